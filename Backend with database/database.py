@@ -1,17 +1,47 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 
 # Step 1
 DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
+# Engine settings (override through the environment, e.g. SQL_ECHO=true)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",     # readers no longer wait behind the writer
+    "synchronous": "NORMAL",   # fsync at checkpoints only; safe with WAL
+    "mmap_size": 268435456,    # read pages through a 256 MB memory map
+    "cache_size": -64000,      # 64 MB page cache per connection
+    "busy_timeout": 5000,      # wait up to 5s for a lock instead of failing
+    "temp_store": "MEMORY",
+}
+
 # Step 2
 engine = create_async_engine(
     DATABASE_URL,
-    echo= True, # Shows SQL queries in console
-    future = True # Important in older versions, enables SQLAlchemy 2.0 style behavior in SQLAlchemy 1.4+
+    echo=SQL_ECHO, # Set SQL_ECHO=true to show SQL queries in console
+    future = True, # Important in older versions, enables SQLAlchemy 2.0 style behavior in SQLAlchemy 1.4+
+    # aiosqlite defaults to NullPool, which opens a new connection per session
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
 )
 
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 # Step 3 - Create session maker
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from database import create_tables
+from database import create_tables, engine
 from routes import user_router
 import uvicorn
 
@@ -13,6 +13,11 @@ app = FastAPI(
 async def startup_event():
     await create_tables()
 
+# Close pooled connections so their worker threads let the process exit
+@app.on_event("shutdown")
+async def shutdown_event():
+    await engine.dispose()
+
 app.include_router(user_router)
 
 @app.get("/")
@@ -1,6 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, delete
+from sqlalchemy.orm import noload, selectinload
 from decimal import Decimal
 from models import Restaurant, MenuItems
 from schemas import MenuItemCreate, MenuItemUpdate
@@ -36,30 +36,34 @@ async def update_menu_item(
     item_id: int,
     item_update: MenuItemUpdate
 ) -> Optional[MenuItems]:
-    # Fetch existing
-    res = await db.execute(select(MenuItems).where(MenuItems.id == item_id))
-    db_item = res.scalar_one_or_none()
-    if not db_item:
-        return None
-
-    # Apply changes
     update_data = item_update.dict(exclude_unset=True)
-    for field, val in update_data.items():
-        setattr(db_item, field, val)
-
+    if not update_data:
+        res = await db.execute(select(MenuItems).where(MenuItems.id == item_id))
+        return res.scalar_one_or_none()
+
+    # One UPDATE ... RETURNING; a missing id comes back as no row
+    res = await db.execute(
+        update(MenuItems)
+        .where(MenuItems.id == item_id)
+        .values(**update_data)
+        .returning(MenuItems)
+        .options(noload(MenuItems.restaurant))
+    )
+    db_item = res.scalar_one_or_none()
     await db.commit()
-    await db.refresh(db_item)
     return db_item
 
 async def delete_menu_item(
     db: AsyncSession,
     item_id: int
 ) -> Optional[MenuItems]:
-    res = await db.execute(select(MenuItems).where(MenuItems.id == item_id))
+    res = await db.execute(
+        delete(MenuItems)
+        .where(MenuItems.id == item_id)
+        .returning(MenuItems)
+        .options(noload(MenuItems.restaurant))
+    )
     db_item = res.scalar_one_or_none()
-    if not db_item:
-        return None
-    await db.delete(db_item)
     await db.commit()
     return db_item
 
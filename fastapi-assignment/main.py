@@ -3,7 +3,7 @@ import uvicorn
 from routes.restaurants import router as restaurants_router
 from routes.menu_items import router as menu_items_router
 from routes.analytics import router as analytics_router
-from database import create_tables
+from database import create_tables, engine
 
 app = FastAPI(title="food delivery application", description="description", version="0.1")
 
@@ -15,6 +15,11 @@ app.include_router(analytics_router)
 async def on_startup():
     await create_tables()
 
+# Close pooled connections so their worker threads let the process exit
+@app.on_event("shutdown")
+async def on_shutdown():
+    await engine.dispose()
+
 @app.get("/", tags=["root"])
 async def read_root():
     return {"message": "Welcome to Zomato v2 API"}
@@ -1,8 +1,38 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, tuple_
+from sqlalchemy.sql import Select
 from models import Restaurant
 from schemas import RestaurantCreate, RestaurantUpdate
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
+
+# Sort orders for keyset pagination: the columns a cursor holds (the last
+# one is always the unique id) and whether pages run high-to-low.
+RESTAURANT_SORTS = {
+    "id": ((Restaurant.id,), False),
+    "rating": ((Restaurant.rating, Restaurant.id), True),
+}
+
+def paginate(
+    stmt: Select,
+    columns: Sequence,
+    descending: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> Select:
+    """Order `stmt` by `columns` and cut one page out of it.
+
+    With `after` (a decoded cursor) the page starts right past that sort key,
+    which an index on `columns` answers without scanning earlier rows.
+    Without it this falls back to OFFSET `skip`.
+    """
+    stmt = stmt.order_by(*(c.desc() if descending else c for c in columns))
+    if after is not None:
+        key, value = tuple_(*columns), tuple_(*after)
+        stmt = stmt.where(key < value if descending else key > value)
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
 
 async def create_restaurant(
     db: AsyncSession,
@@ -26,10 +56,13 @@ async def get_restaurant(
 async def get_restaurants(
     db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[Tuple] = None,
+    sort: str = "id"
 ) -> List[Restaurant]:
+    columns, descending = RESTAURANT_SORTS[sort]
     result = await db.execute(
-        select(Restaurant).offset(skip).limit(limit)
+        paginate(select(Restaurant), columns, descending, skip, limit, after)
     )
     return result.scalars().all()
 
@@ -38,22 +71,19 @@ async def update_restaurant(
     restaurant_id: int,
     restaurant_update: RestaurantUpdate
 ) -> Optional[Restaurant]:
-    # 1. Fetch existing
+    update_data = restaurant_update.dict(exclude_unset=True)
+    if not update_data:
+        return await get_restaurant(db, restaurant_id)
+
+    # One UPDATE ... RETURNING; a missing id comes back as no row
     result = await db.execute(
-        select(Restaurant).where(Restaurant.id == restaurant_id)
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(**update_data)
+        .returning(Restaurant)
     )
     db_restaurant = result.scalar_one_or_none()
-    if not db_restaurant:
-        return None
-
-    # 2. Apply updates
-    update_data = restaurant_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_restaurant, field, value)
-
-    # 3. Commit & refresh
     await db.commit()
-    await db.refresh(db_restaurant)
     return db_restaurant
 
 async def delete_restaurant(
@@ -61,13 +91,11 @@ async def delete_restaurant(
     restaurant_id: int
 ) -> Optional[Restaurant]:
     result = await db.execute(
-        select(Restaurant).where(Restaurant.id == restaurant_id)
+        delete(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .returning(Restaurant)
     )
     db_restaurant = result.scalar_one_or_none()
-    if not db_restaurant:
-        return None
-
-    await db.delete(db_restaurant)
     await db.commit()
     return db_restaurant
 
@@ -75,25 +103,27 @@ async def search_restaurants_by_cuisine(
     db: AsyncSession,
     cuisine: str,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[Tuple] = None
 ) -> List[Restaurant]:
     result = await db.execute(
-        select(Restaurant)
-        .where(Restaurant.cuisine_type.ilike(f"%{cuisine}%"))
-        .offset(skip)
-        .limit(limit)
+        paginate(
+            select(Restaurant).where(Restaurant.cuisine_type.ilike(f"%{cuisine}%")),
+            (Restaurant.id,), skip=skip, limit=limit, after=after
+        )
     )
     return result.scalars().all()
 
 async def get_active_restaurants(
     db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[Tuple] = None
 ) -> List[Restaurant]:
     result = await db.execute(
-        select(Restaurant)
-        .where(Restaurant.is_active == True)
-        .offset(skip)
-        .limit(limit)
+        paginate(
+            select(Restaurant).where(Restaurant.is_active == True),
+            (Restaurant.id,), skip=skip, limit=limit, after=after
+        )
     )
     return result.scalars().all()
@@ -3,9 +3,8 @@
 from fastapi import FastAPI
 import uvicorn
 
-from database import create_tables
+from database import create_tables, engine
 from routes import router as restaurant_router
-from database import create_tables
 
 app = FastAPI(
     title="Zomato v1: Restaurant Management",
@@ -18,6 +17,11 @@ app = FastAPI(
 async def on_startup():
     await create_tables()
 
+# Close pooled connections so their worker threads let the process exit
+@app.on_event("shutdown")
+async def on_shutdown():
+    await engine.dispose()
+
 # 2. Include our restaurants router
 app.include_router(restaurant_router)
 
@@ -20,7 +20,7 @@ class Restaurant(Base):
     cuisine_type = Column(String(50), nullable=False, index=True)
     address = Column(String(200), nullable=False)
     phone_number = Column(String(20), nullable=False, unique=True)
-    rating = Column(Float, default=0.0)
+    rating = Column(Float, default=0.0, index=True)
     is_active = Column(Boolean, default=True)
     opening_time = Column(Time, nullable=False)
     closing_time = Column(Time, nullable=False)
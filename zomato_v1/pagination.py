@@ -0,0 +1,56 @@
+# pagination.py
+#
+# Opaque cursors for keyset pagination. A cursor is the sort key of the last
+# row on a page; the next page seeks straight past it instead of making
+# SQLite walk and discard `skip` rows the way OFFSET does.
+
+import base64
+import json
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_sort_key(values: list) -> bool:
+    # leading sort columns are numbers (a NULL rating comes back as None),
+    # the last one is always the integer id
+    *leading, last = values
+    return (
+        all(value is None or _is_number(value) for value in leading)
+        and isinstance(last, int) and not isinstance(last, bool)
+    )
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[Tuple]:
+    """Sort key stored in `cursor`, or None when no cursor was given."""
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size or not _is_sort_key(values):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor."
+        )
+    return tuple(values)
+
+
+def next_cursor(rows: Sequence, limit: int, columns: Sequence) -> Optional[str]:
+    """Cursor for the page after `rows`, or None when this was the last one."""
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor(*(getattr(rows[-1], column.key) for column in columns))
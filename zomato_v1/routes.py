@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
 
 from database import get_db
 from schemas import (
@@ -9,12 +9,19 @@ from schemas import (
     RestaurantResponse
 )
 import crud
+from models import Restaurant
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
 
 router = APIRouter(
     prefix="/restaurants",
     tags=["restaurants"]
 )
 
+def _set_next_cursor(response: Response, rows, limit: int, columns) -> None:
+    cursor = next_cursor(rows, limit, columns)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
 @router.post(
     "/",
     response_model=RestaurantResponse,
@@ -40,11 +47,58 @@ async def create_restaurant(
     response_model=List[RestaurantResponse]
 )
 async def read_restaurants(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "rating"] = "id",
+    db: AsyncSession = Depends(get_db)
+):
+    # `cursor` (from the previous page's X-Next-Cursor) replaces `skip`
+    columns, _ = crud.RESTAURANT_SORTS[sort]
+    after = decode_cursor(cursor, len(columns))
+    restaurants = await crud.get_restaurants(
+        db, skip=skip, limit=limit, after=after, sort=sort
+    )
+    _set_next_cursor(response, restaurants, limit, columns)
+    return restaurants
+
+# /search and /active must be registered before /{restaurant_id}
+@router.get(
+    "/search",
+    response_model=List[RestaurantResponse]
+)
+async def search_by_cuisine(
+    response: Response,
+    cuisine: str,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    return await crud.get_restaurants(db, skip=skip, limit=limit)
+    restaurants = await crud.search_restaurants_by_cuisine(
+        db, cuisine=cuisine, skip=skip, limit=limit,
+        after=decode_cursor(cursor, 1)
+    )
+    _set_next_cursor(response, restaurants, limit, (Restaurant.id,))
+    return restaurants
+
+@router.get(
+    "/active",
+    response_model=List[RestaurantResponse]
+)
+async def list_active_restaurants(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    restaurants = await crud.get_active_restaurants(
+        db, skip=skip, limit=limit, after=decode_cursor(cursor, 1)
+    )
+    _set_next_cursor(response, restaurants, limit, (Restaurant.id,))
+    return restaurants
 
 @router.get(
     "/{restaurant_id}",
@@ -94,28 +148,3 @@ async def delete_restaurant(
             detail="Restaurant not found."
         )
     return deleted
-
-@router.get(
-    "/search",
-    response_model=List[RestaurantResponse]
-)
-async def search_by_cuisine(
-    cuisine: str,
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
-):
-    return await crud.search_restaurants_by_cuisine(
-        db, cuisine=cuisine, skip=skip, limit=limit
-    )
-
-@router.get(
-    "/active",
-    response_model=List[RestaurantResponse]
-)
-async def list_active_restaurants(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db)
-):
-    return await crud.get_active_restaurants(db, skip=skip, limit=limit)
@@ -0,0 +1,494 @@
+import asyncio
+import contextlib
+import inspect
+import logging
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from fastapi.params import Depends
+from fastapi_cache import FastAPICache
+from redis.exceptions import LockError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import Response
+
+import cache_manifest
+import cache_metrics
+from cache_backend import INVALIDATION_CHANNEL
+from cache_coder import RenderedResponseCoder
+from database import AsyncSessionLocal, LazySession
+
+logger = logging.getLogger(__name__)
+
+# Objects handed to an endpoint by FastAPI's dependency injection. They are
+# different on every request, so they must never end up in a cache key.
+SESSION_TYPES = (AsyncSession, LazySession)
+INJECTED_TYPES = (*SESSION_TYPES, Request, Response, Depends)
+
+# Query params that are matched case-insensitively by crud.py (ILIKE),
+# so "Italian" and "italian" should share a cache entry.
+CASE_FOLDED_PARAMS = {"cuisine"}
+
+
+def _normalize(name: str, value: Any) -> str:
+    if isinstance(value, str):
+        value = value.strip()
+        if name in CASE_FOLDED_PARAMS:
+            value = value.casefold()
+    elif isinstance(value, bool):
+        value = str(value).lower()
+    return str(value)
+
+
+def route_params(func: Callable, args: tuple, kwargs: dict) -> Dict[str, str]:
+    """Bind the call to the endpoint signature and keep only the real params.
+
+    Defaults are filled in, so `GET /restaurants/` and
+    `GET /restaurants/?skip=0&limit=100` produce the same params.
+    """
+    bound = inspect.signature(func).bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+    return {
+        name: _normalize(name, value)
+        for name, value in bound.arguments.items()
+        if not isinstance(value, INJECTED_TYPES) and value is not None
+    }
+
+
+def _entity_id(params: Dict[str, str]) -> Optional[str]:
+    name = next(iter(params), "")
+    if len(params) == 1 and (name == "id" or name.endswith("_id")):
+        return params[name]
+    return None
+
+
+def make_key(
+    namespace: str, kind: str, params: Dict[str, str], generation: int = 0
+) -> str:
+    """Render a readable cache key.
+
+    A single `*_id` param renders as `restaurants:detail:42:v0`, anything
+    else as sorted `name=value` pairs: `restaurants:list:limit=100:skip=0:v0`.
+    The trailing `v<n>` is the generation the entry was written under.
+    """
+    parts = [FastAPICache.get_prefix(), namespace, kind]
+    entity_id = _entity_id(params)
+    if entity_id is not None:
+        parts.append(entity_id)
+    else:
+        parts.extend(f"{name}={params[name]}" for name in sorted(params))
+    parts.append(f"v{generation}")
+    return ":".join(part for part in parts if part)
+
+
+# ── Generations ─────────────────────────────────────────────────
+#
+# Instead of deleting entries on writes, every key embeds a generation
+# number. A write bumps the generations it affects, so readers start using
+# new keys and the old entries simply age out by TTL. One edit costs a
+# single round trip no matter how many pages or searches are cached.
+#
+#   collection:<kind>         - every page of one list route
+#   collection:<kind>:<term>  - pages of a search route for one term
+#   entity:<id>               - the detail entry of one row
+
+# Generation counters outlive every cached entry (max TTL is 600s), so a
+# counter that expires and restarts at 0 can never resurrect a stale entry.
+GENERATION_TTL = 24 * 60 * 60
+
+
+def entity_scope(entity_id: Any) -> str:
+    return f"entity:{entity_id}"
+
+
+def collection_scope(kind: str, term: Optional[str] = None) -> str:
+    return f"collection:{kind}" + (f":{term}" if term is not None else "")
+
+
+def terms_key(namespace: str, kind: str) -> str:
+    return f"{FastAPICache.get_prefix()}:{namespace}:terms:{kind}"
+
+
+# Backends without Redis (e.g. InMemoryBackend) keep their terms here:
+# terms key -> {term: monotonic expiry}
+_local_terms: Dict[str, Dict[str, float]] = {}
+
+
+async def register_term(namespace: str, kind: str, term: str, expire: int) -> None:
+    """Remember that pages for `term` are cached, see `matching_terms`."""
+    key = terms_key(namespace, kind)
+    redis = getattr(FastAPICache.get_backend(), "redis", None)
+    if redis is None:
+        _local_terms.setdefault(key, {})[term] = time.monotonic() + expire
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.sadd(key, term)
+        # the set is only useful while search entries can still be alive
+        pipe.expire(key, expire)
+        await pipe.execute()
+
+
+async def matching_terms(namespace: str, kind: str, values: Iterable[str]) -> List[str]:
+    """Cached search terms that match any of `values` (ILIKE %term%)."""
+    key = terms_key(namespace, kind)
+    redis = getattr(FastAPICache.get_backend(), "redis", None)
+    if redis is None:
+        now = time.monotonic()
+        local = _local_terms.get(key, {})
+        for term in [term for term, expires_at in local.items() if expires_at <= now]:
+            del local[term]
+        terms = list(local)
+    else:
+        terms = await redis.smembers(key)
+    values = [value.casefold() for value in values]
+    return [term for term in terms if any(term in value for value in values)]
+
+
+def generation_key(namespace: str, scope: str) -> str:
+    return f"{FastAPICache.get_prefix()}:{namespace}:gen:{scope}"
+
+
+async def get_generation(namespace: str, scope: str) -> int:
+    backend = FastAPICache.get_backend()
+    key = generation_key(namespace, scope)
+    value = await backend.get(key)
+    l1 = getattr(backend, "l1", None)
+    if value is None and l1 is not None:
+        # remember "never bumped" locally too; a bump is broadcast anyway
+        l1.set(key, "0")
+    return int(value) if value else 0
+
+
+async def bump_generations(namespace: str, *scopes: str) -> None:
+    """Invalidate every entry under `scopes` with one round trip."""
+    backend = FastAPICache.get_backend()
+    keys = [generation_key(namespace, scope) for scope in scopes]
+    redis = getattr(backend, "redis", None)
+    if redis is not None:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.expire(key, GENERATION_TTL)
+            # other workers drop their L1 copy of the old generation
+            pipe.publish(INVALIDATION_CHANNEL, " ".join(keys))
+            await pipe.execute()
+        l1 = getattr(backend, "l1", None)
+        if l1 is not None:
+            l1.delete(keys)
+        return
+    # Backends without INCR (e.g. InMemoryBackend in local runs)
+    for key in keys:
+        value = await backend.get(key)
+        await backend.set(key, str(int(value or 0) + 1), GENERATION_TTL)
+
+
+def key_scope(kind: str, params: Dict[str, str], term_param: Optional[str] = None) -> str:
+    entity_id = _entity_id(params)
+    if entity_id is not None:
+        return entity_scope(entity_id)
+    return collection_scope(kind, params.get(term_param) if term_param else None)
+
+
+async def build_key(
+    namespace: str, kind: str, params: Dict[str, str], term_param: Optional[str] = None
+) -> str:
+    """Cache key for one endpoint call, from its `route_params`.
+
+    The default fastapi-cache2 builder hashes every kwarg, including the
+    `AsyncSession` from `Depends(get_db)`, so two identical requests never
+    share a key.
+    """
+    scope = key_scope(kind, params, term_param)
+    generation = await get_generation(namespace, scope)
+    return make_key(namespace, kind, params, generation)
+
+
+# ── Negative entries ────────────────────────────────────────────
+#
+# A 404 from an endpoint with `negative_ttl` is cached as a short-lived
+# marker, so bots probing random ids stop reaching SQLite. The marker lives
+# under the entity's generation, so creating that id invalidates it.
+
+NOT_FOUND = "!404:"  # never produced by the JSON coder
+
+
+def decode(value: str, coder: Any) -> Any:
+    """Decode a cached value, re-raising a cached 404."""
+    if value.startswith(NOT_FOUND):
+        raise HTTPException(status_code=404, detail=value[len(NOT_FOUND):])
+    return coder.decode(value)
+
+
+# ── Single-flight ───────────────────────────────────────────────
+#
+# When a hot key expires every concurrent request misses at once. Only one
+# coroutine per key (per worker) recomputes the value, the others await its
+# result. Across workers a short Redis lock does the same job: the losers
+# poll the cache until the winner has stored the value.
+
+LOCK_TIMEOUT = 5  # seconds, upper bound for one recompute
+LOCK_POLL_INTERVAL = 0.05
+
+_inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+
+async def _load_once_across_workers(
+    key: str, load: Callable[[], Awaitable[Any]], coder: Any
+) -> Any:
+    backend = FastAPICache.get_backend()
+    redis = getattr(backend, "redis", None)
+    if redis is None:
+        return await load()
+
+    lock = redis.lock(f"{key}:lock", timeout=LOCK_TIMEOUT, blocking=False)
+    if await lock.acquire():
+        try:
+            return await load()
+        finally:
+            with contextlib.suppress(LockError):
+                await lock.release()
+
+    # another worker is recomputing this key
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LOCK_TIMEOUT
+    while loop.time() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        value = await backend.get(key)
+        if value is not None:
+            return decode(value, coder)
+    return await load()
+
+
+async def single_flight(key: str, load: Callable[[], Awaitable[Any]], coder: Any) -> Any:
+    """Run `load` once per key; concurrent callers share its result.
+
+    If the caller running `load` is cancelled (its client went away), the
+    others do not inherit that: the first of them to retry runs `load`.
+    """
+    while True:
+        future = _inflight.get(key)
+        if future is None:
+            break
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise  # this caller was cancelled, not the loader
+
+    future = asyncio.get_running_loop().create_future()
+    # an error nobody else awaited must not be reported as "never retrieved"
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    _inflight[key] = future
+    try:
+        result = await _load_once_across_workers(key, load, coder)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        del _inflight[key]
+
+
+# ── Stale-while-revalidate ──────────────────────────────────────
+#
+# Routes with a `soft_ttl` keep entries in the backend for the full (hard)
+# `expire`. Past the soft TTL the stale value is still served immediately
+# while one background task reloads it, so nobody pays DB latency at
+# expiry. Keys hit often are refreshed a little before their soft TTL.
+
+REFRESH_AHEAD_RATIO = 0.8  # of soft_ttl
+REFRESH_AHEAD_HITS = 10    # hits on one entry before it counts as hot
+MAX_TRACKED_KEYS = 10_000
+
+_refreshing: Dict[str, "asyncio.Task[None]"] = {}
+_hits: Dict[str, int] = {}
+
+
+def _is_hot(key: str) -> bool:
+    if len(_hits) >= MAX_TRACKED_KEYS:
+        _hits.clear()
+    _hits[key] = _hits.get(key, 0) + 1
+    return _hits[key] >= REFRESH_AHEAD_HITS
+
+
+def _with_own_session(session: AsyncSession, args: tuple, kwargs: dict):
+    """Swap the request's session (closed once it returns) for `session`."""
+    args = tuple(session if isinstance(a, SESSION_TYPES) else a for a in args)
+    kwargs = {k: session if isinstance(v, SESSION_TYPES) else v for k, v in kwargs.items()}
+    return args, kwargs
+
+
+async def _refresh(key: str, load: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict) -> None:
+    redis = getattr(FastAPICache.get_backend(), "redis", None)
+    lock = None
+    if redis is not None:
+        lock = redis.lock(f"{key}:lock", timeout=LOCK_TIMEOUT, blocking=False)
+        if not await lock.acquire():
+            return  # another worker is already refreshing it
+    try:
+        async with AsyncSessionLocal() as session:
+            own_args, own_kwargs = _with_own_session(session, args, kwargs)
+            await load(*own_args, **own_kwargs)
+        _hits.pop(key, None)
+        if redis is not None:
+            # other workers drop their stale L1 copy
+            await redis.publish(INVALIDATION_CHANNEL, key)
+    except Exception:
+        logger.warning(f"Background refresh of '{key}' failed:", exc_info=True)
+    finally:
+        if lock is not None:
+            with contextlib.suppress(LockError):
+                await lock.release()
+
+
+def refresh_in_background(key: str, load: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict) -> bool:
+    """Schedule a reload of `key`; False if one is already running here."""
+    if key in _refreshing:
+        return False
+    task = asyncio.create_task(_refresh(key, load, args, kwargs))
+    _refreshing[key] = task
+    task.add_done_callback(lambda _: _refreshing.pop(key, None))
+    return True
+
+
+# ── Decorator ───────────────────────────────────────────────────
+
+def cached(
+    namespace: str,
+    kind: str,
+    expire: int,
+    soft_ttl: Optional[int] = None,
+    negative_ttl: Optional[int] = None,
+    term_param: Optional[str] = None,
+):
+    """Cache a GET endpoint, like `fastapi_cache.decorator.cache`.
+
+    Uses the backend and prefix configured by `FastAPICache.init`, builds
+    readable generation-aware keys and coalesces concurrent misses. Endpoints
+    with a return annotation store pre-rendered JSON bodies (see
+    `RenderedResponseCoder`); others use the configured coder.
+    `expire` is the hard TTL; with `soft_ttl` set, entries older than it are
+    served stale and revalidated in the background. With `negative_ttl` set,
+    404s are cached for that many seconds. `term_param` gives each value of
+    that search param its own generation (see `matching_terms`).
+
+    The wrapped endpoint gets a `store(value, **params)` coroutine for
+    write-through: it puts a fresh value under the key those params read.
+    """
+    def wrapper(func: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(func)
+        rendered = None
+        if signature.return_annotation is not inspect.Signature.empty:
+            rendered = RenderedResponseCoder(signature.return_annotation)
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            request: Optional[Request] = kwargs.pop("request", None)
+            response: Optional[Response] = kwargs.pop("response", None)
+            if not FastAPICache.get_enable() or (
+                request is not None
+                and request.headers.get("Cache-Control") in ("no-store", "no-cache")
+            ):
+                return await func(*args, **kwargs)
+
+            backend = FastAPICache.get_backend()
+            coder = rendered or FastAPICache.get_coder()
+            params = route_params(func, args, kwargs)
+            key = await build_key(namespace, kind, params, term_param)
+            if request is not None:
+                # warm-up calls the endpoint directly; only client reads count
+                cache_manifest.record_read(namespace, kind, params)
+
+            def record(field: str, amount: float = 1) -> None:
+                cache_metrics.record(namespace, kind, field, amount)
+
+            async def load(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except HTTPException as exc:
+                    if negative_ttl and exc.status_code == 404:
+                        with contextlib.suppress(Exception):
+                            await backend.set(key, f"{NOT_FOUND}{exc.detail}", negative_ttl)
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    record("load_seconds", elapsed)
+                    logger.debug(f"Cache miss '{key}' loaded in {elapsed * 1000:.2f}ms")
+                try:
+                    await backend.set(key, coder.encode(result), expire)
+                    if term_param:
+                        await register_term(namespace, kind, params[term_param], expire)
+                except Exception:
+                    record("errors")
+                    logger.warning(f"Error setting cache key '{key}' in backend:", exc_info=True)
+                return result
+
+            start = time.perf_counter()
+            try:
+                ttl, value = await backend.get_with_ttl(key)
+            except Exception:
+                record("errors")
+                logger.warning(f"Error retrieving cache key '{key}' from backend:", exc_info=True)
+                ttl, value = 0, None
+            record("lookup_seconds", time.perf_counter() - start)
+            if value is not None and value.startswith(NOT_FOUND):
+                record("negative_hits")
+                return decode(value, coder)
+            if value is not None:
+                max_age = ttl
+                stale = False
+                if soft_ttl is not None:
+                    age = expire - ttl
+                    max_age = max(soft_ttl - age, 0)
+                    stale = age >= soft_ttl
+                    refresh_at = soft_ttl * REFRESH_AHEAD_RATIO if _is_hot(key) else soft_ttl
+                    if age >= refresh_at:
+                        if refresh_in_background(key, load, args, kwargs):
+                            record("refreshes")
+                record("stale_hits" if stale else "hits")
+                headers = {"Cache-Control": f"max-age={max_age}"}
+                if request is not None and rendered is not None:
+                    # straight to the socket, no decode or re-validation
+                    return rendered.to_response(value, headers)
+                if response is not None:
+                    response.headers.update(headers)
+                return decode(value, coder)
+
+            record("misses")
+            result = await single_flight(key, lambda: load(*args, **kwargs), coder)
+            if response is not None:
+                response.headers["Cache-Control"] = f"max-age={soft_ttl or expire}"
+            return result
+
+        async def store(value: Any, *args, **kwargs) -> None:
+            """Write-through: cache `value` as the result for these params."""
+            backend = FastAPICache.get_backend()
+            coder = rendered or FastAPICache.get_coder()
+            key = await build_key(namespace, kind, route_params(func, args, kwargs), term_param)
+            await backend.set(key, coder.encode(value), expire)
+            redis = getattr(backend, "redis", None)
+            if redis is not None:
+                # other workers drop the old value from their L1
+                await redis.publish(INVALIDATION_CHANNEL, key)
+
+        inner.store = store
+
+        # let FastAPI inject request/response next to the endpoint's own params
+        inner.__signature__ = signature.replace(
+            parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+                inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+            ]
+        )
+        return inner
+
+    return wrapper
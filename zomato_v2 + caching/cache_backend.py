@@ -0,0 +1,190 @@
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi_cache.backends import Backend
+from fastapi_cache.backends.redis import RedisBackend
+
+logger = logging.getLogger(__name__)
+
+# Every worker subscribes here and drops the keys it receives from its L1.
+INVALIDATION_CHANNEL = "zomato-cache:invalidate"
+RESUBSCRIBE_MIN_DELAY = 0.5  # seconds, doubled after each failed attempt
+RESUBSCRIBE_MAX_DELAY = 30
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry expiry (the L1 tier)."""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Optional[float], str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[int, str]]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        evict_at, expires_at, value = entry
+        now = time.monotonic()
+        if evict_at <= now:
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        # report the TTL the entry has in Redis, not the L1 one
+        remaining = math.ceil(expires_at - now) if expires_at is not None else -1
+        return remaining, value
+
+    def set(self, key: str, value: str, expire: Optional[int] = None) -> None:
+        # never keep an entry longer than the L1 TTL, nor longer than Redis would
+        now = time.monotonic()
+        ttl = min(self.ttl, expire) if expire else self.ttl
+        expires_at = now + expire if expire else None
+        self._data[key] = (now + ttl, expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self, prefix: Optional[str] = None) -> None:
+        if prefix is None:
+            self._data.clear()
+            return
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+class TieredBackend(Backend):
+    """fastapi-cache2 backend: in-process LRU (L1) in front of Redis (L2).
+
+    Hits on hot keys are served from process memory. Writes go to both
+    tiers; invalidations are broadcast over Redis pub/sub so every worker
+    drops its copy (see `listen_for_invalidations`).
+    """
+
+    def __init__(self, l2: RedisBackend, l1: Optional[LRUCache] = None):
+        self.l2 = l2
+        self.l1 = l1 or LRUCache()
+        self.l2_hits = 0
+        self.l2_misses = 0
+
+    @property
+    def redis(self):
+        return self.l2.redis
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        cached = self.l1.get(key)
+        if cached is not None:
+            return cached
+        ttl, value = await self.l2.get_with_ttl(key)
+        if value is None:
+            self.l2_misses += 1
+            return 0, None
+        self.l2_hits += 1
+        # ttl is -1 for keys without expiry (e.g. generation counters)
+        self.l1.set(key, value, ttl if ttl > 0 else None)
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[str]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: str, expire: Optional[int] = None) -> None:
+        await self.l2.set(key, value, expire)
+        self.l1.set(key, value, expire)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if namespace:
+            self.l1.clear(namespace)
+            pattern = f"{namespace}*"
+        elif key:
+            self.l1.delete([key])
+            pattern = key
+        else:
+            return 0
+        if namespace:
+            count = await self._unlink_matching(f"{namespace}:*")
+        else:
+            count = await self.redis.delete(key)
+        await self.redis.publish(INVALIDATION_CHANNEL, pattern)
+        return count
+
+    async def _unlink_matching(self, match: str) -> int:
+        # RedisBackend.clear runs KEYS inside a Lua script, which blocks
+        # Redis for the whole keyspace walk; SCAN + UNLINK works in steps.
+        count = 0
+        batch = []
+        async for name in self.redis.scan_iter(match=match, count=500):
+            batch.append(name)
+            if len(batch) >= 500:
+                count += await self.redis.unlink(*batch)
+                batch = []
+        if batch:
+            count += await self.redis.unlink(*batch)
+        return count
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "l1": self.l1.stats(),
+            "l2": {"hits": self.l2_hits, "misses": self.l2_misses},
+        }
+
+
+async def listen_for_invalidations(backend: TieredBackend) -> None:
+    """Drop L1 entries named on the invalidation channel (runs per worker).
+
+    Messages are space-separated keys; a key ending in `*` drops a prefix.
+    If the subscription fails (e.g. Redis drops the connection), the error
+    is logged and the listener resubscribes with exponential backoff.
+    """
+    delay = RESUBSCRIBE_MIN_DELAY
+    while True:
+        pubsub = backend.redis.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            # whatever was published while we were not subscribed is lost
+            backend.l1.clear()
+            delay = RESUBSCRIBE_MIN_DELAY
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                for key in message["data"].split():
+                    if key.endswith("*"):
+                        backend.l1.clear(key[:-1])
+                    else:
+                        backend.l1.delete([key])
+        except asyncio.CancelledError:
+            with contextlib.suppress(Exception):
+                await pubsub.unsubscribe(INVALIDATION_CHANNEL)
+            raise
+        except Exception:
+            logger.warning(
+                f"Invalidation listener failed; resubscribing in {delay:g}s:", exc_info=True
+            )
+        finally:
+            with contextlib.suppress(Exception):
+                await pubsub.aclose()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RESUBSCRIBE_MAX_DELAY)
@@ -0,0 +1,33 @@
+from typing import Any, Dict, Optional
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+
+class RenderedResponseCoder:
+    """Coder that stores the exact JSON body a route sends to the client.
+
+    fastapi-cache2's JsonCoder stores a tagged JSON document that has to be
+    decoded and then re-validated through the response model on every hit.
+    This coder validates and renders once, when the entry is written, so a
+    hit is returned as a raw `Response` without touching Pydantic.
+
+    Same `encode`/`decode` interface as `fastapi_cache.coder.Coder`;
+    `cache.cached` picks it for endpoints with a return annotation.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, response_model: Any):
+        self.adapter = TypeAdapter(response_model)
+
+    def encode(self, value: Any) -> str:
+        model = self.adapter.validate_python(value, from_attributes=True)
+        return self.adapter.dump_json(model).decode()
+
+    def decode(self, value: str) -> Any:
+        # for in-process callers (warm-up, demo) that want model objects
+        return self.adapter.validate_json(value)
+
+    def to_response(self, value: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        return Response(content=value, media_type=self.media_type, headers=headers)
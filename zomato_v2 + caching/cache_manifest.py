@@ -0,0 +1,69 @@
+import asyncio
+import json
+import logging
+from collections import Counter, defaultdict
+from typing import DefaultDict, Dict, List, Tuple
+
+from fastapi_cache import FastAPICache
+
+logger = logging.getLogger(__name__)
+
+# Hot-key manifest: how often each (route kind, params) was read. Counts are
+# kept in-process and flushed to a Redis sorted set per route kind, so the
+# manifest survives deploys and covers every worker. `warmup.py` reads it.
+# Scores decay on every flush, so yesterday's traffic fades out, and a route
+# kind nobody reads for MANIFEST_TTL drops its manifest entirely.
+
+FLUSH_INTERVAL = 60  # seconds
+MAX_PENDING = 10_000  # distinct params kept in memory per route kind
+MANIFEST_SIZE = 1_000  # members kept per route kind in Redis
+HALF_LIFE = 24 * 3600  # seconds for a score to halve
+DECAY = 0.5 ** (FLUSH_INTERVAL / HALF_LIFE)  # applied once per flush
+MANIFEST_TTL = 7 * 24 * 3600  # seconds
+
+_pending: DefaultDict[Tuple[str, str], Counter] = defaultdict(Counter)
+
+
+def manifest_key(namespace: str, kind: str) -> str:
+    return f"{FastAPICache.get_prefix()}:manifest:{namespace}:{kind}"
+
+
+def record_read(namespace: str, kind: str, params: Dict[str, str]) -> None:
+    counts = _pending[(namespace, kind)]
+    counts[json.dumps(params, sort_keys=True)] += 1
+    if len(counts) > MAX_PENDING:
+        _pending[(namespace, kind)] = Counter(dict(counts.most_common(MANIFEST_SIZE)))
+
+
+async def flush() -> None:
+    if not _pending:
+        return
+    pending = dict(_pending)
+    _pending.clear()
+    redis = FastAPICache.get_backend().redis
+    async with redis.pipeline(transaction=False) as pipe:
+        for (namespace, kind), counts in pending.items():
+            key = manifest_key(namespace, kind)
+            pipe.zunionstore(key, {key: DECAY})
+            for member, count in counts.items():
+                pipe.zincrby(key, count, member)
+            # keep only the hottest members
+            pipe.zremrangebyrank(key, 0, -MANIFEST_SIZE - 1)
+            pipe.expire(key, MANIFEST_TTL)
+        await pipe.execute()
+
+
+async def flush_periodically() -> None:
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        try:
+            await flush()
+        except Exception:
+            logger.warning("Flushing the hot-key manifest failed:", exc_info=True)
+
+
+async def top(namespace: str, kind: str, n: int) -> List[Dict[str, str]]:
+    """The `n` most-read param sets of one route kind, hottest first."""
+    redis = FastAPICache.get_backend().redis
+    members = await redis.zrevrange(manifest_key(namespace, kind), 0, n - 1)
+    return [json.loads(member) for member in members]
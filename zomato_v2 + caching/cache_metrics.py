@@ -0,0 +1,114 @@
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, Tuple
+
+# Counters recorded by `cache.cached` for every (namespace, route kind).
+# Plain in-process numbers: reading them never touches Redis.
+FIELDS = (
+    "hits",            # fresh hit (L1 or Redis)
+    "stale_hits",      # served past soft TTL, refresh scheduled
+    "negative_hits",   # cached 404, the DB was not asked
+    "misses",          # value loaded from the DB by the request
+    "refreshes",       # background reloads
+    "errors",          # backend get/set failures
+    "lookup_seconds",  # time spent reading the cache, summed
+    "load_seconds",    # time spent loading from the DB, summed
+)
+
+_counters: DefaultDict[Tuple[str, str], Dict[str, float]] = defaultdict(
+    lambda: dict.fromkeys(FIELDS, 0)
+)
+
+# SCAN budget for one size estimate; each SCAN call is a short O(count) step
+# so other clients are never blocked the way KEYS blocks them.
+SCAN_COUNT = 500
+SCAN_SAMPLE = 5_000
+
+
+def record(namespace: str, kind: str, field: str, amount: float = 1) -> None:
+    _counters[(namespace, kind)][field] += amount
+
+
+def snapshot() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Counters as `{namespace: {route: {field: value}}}`."""
+    result: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for (namespace, kind), fields in sorted(_counters.items()):
+        stats = dict(fields)
+        served = stats["hits"] + stats["stale_hits"] + stats["negative_hits"]
+        lookups = served + stats["misses"]
+        stats["hit_ratio"] = round(served / lookups, 4) if lookups else 0.0
+        result.setdefault(namespace, {})[kind] = stats
+    return result
+
+
+async def estimate_size(redis: Any, prefix: str) -> Dict[str, Any]:
+    """Estimate how many keys live under `prefix`, per namespace.
+
+    Walks the keyspace with SCAN for at most SCAN_SAMPLE keys and scales the
+    share of matching keys by DBSIZE. The estimate is exact when the walk
+    finishes before the sample budget runs out.
+    """
+    total = await redis.dbsize()
+    sampled = 0
+    per_namespace: DefaultDict[str, int] = defaultdict(int)
+    cursor = 0
+    while True:
+        cursor, keys = await redis.scan(cursor, count=SCAN_COUNT)
+        sampled += len(keys)
+        for key in keys:
+            if key.startswith(f"{prefix}:"):
+                per_namespace[key.split(":", 2)[1]] += 1
+        if cursor == 0 or sampled >= SCAN_SAMPLE:
+            break
+
+    exact = cursor == 0
+    scale = 1 if exact or not sampled else total / sampled
+    return {
+        "exact": exact,
+        "sampled_keys": sampled,
+        "redis_keys": total,
+        "keys": round(sum(per_namespace.values()) * scale),
+        "namespaces": {ns: round(n * scale) for ns, n in sorted(per_namespace.items())},
+    }
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def to_prometheus(stats: Dict[str, Any]) -> str:
+    """Render the `/cache/stats` payload in Prometheus text format."""
+    lines = [
+        "# TYPE zomato_cache_requests_total counter",
+        "# TYPE zomato_cache_refreshes_total counter",
+        "# TYPE zomato_cache_errors_total counter",
+        "# TYPE zomato_cache_lookup_seconds summary",
+        "# TYPE zomato_cache_load_seconds summary",
+    ]
+    for namespace, routes in stats["routes"].items():
+        for kind, s in routes.items():
+            route = dict(namespace=namespace, route=kind)
+            for result, field in (
+                ("hit", "hits"), ("stale", "stale_hits"),
+                ("negative", "negative_hits"), ("miss", "misses"),
+            ):
+                lines.append(f"zomato_cache_requests_total{_labels(**route, result=result)} {s[field]}")
+            lines.append(f"zomato_cache_refreshes_total{_labels(**route)} {s['refreshes']}")
+            lines.append(f"zomato_cache_errors_total{_labels(**route)} {s['errors']}")
+            lookups = s["hits"] + s["stale_hits"] + s["negative_hits"] + s["misses"]
+            lines.append(f"zomato_cache_lookup_seconds_sum{_labels(**route)} {s['lookup_seconds']}")
+            lines.append(f"zomato_cache_lookup_seconds_count{_labels(**route)} {lookups}")
+            lines.append(f"zomato_cache_load_seconds_sum{_labels(**route)} {s['load_seconds']}")
+            lines.append(f"zomato_cache_load_seconds_count{_labels(**route)} {s['misses'] + s['refreshes']}")
+
+    lines.append("# TYPE zomato_cache_tier_total counter")
+    for tier, s in stats.get("tiers", {}).items():
+        for field in ("hits", "misses", "evictions"):
+            if field in s:
+                lines.append(f"zomato_cache_tier_total{_labels(tier=tier, result=field)} {s[field]}")
+
+    size = stats.get("size")
+    if size:
+        lines.append("# TYPE zomato_cache_keys gauge")
+        for namespace, n in size["namespaces"].items():
+            lines.append(f"zomato_cache_keys{_labels(namespace=namespace)} {n}")
+    return "\n".join(lines) + "\n"
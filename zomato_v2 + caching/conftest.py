@@ -0,0 +1,75 @@
+# conftest.py
+#
+# Tests run the restaurant routes against a fresh SQLite file and an
+# in-process cache backend, without main.py's startup (which needs a
+# real Redis). DATABASE_URL is relative and resolved when the engine is
+# created, so the tests move to a scratch directory before importing it.
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fakeredis import aioredis as fakeredis
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="zomato-cache-tests-"))
+os.chdir(WORKDIR)
+
+import cache  # noqa: E402
+import cache_manifest  # noqa: E402
+from cache_backend import LRUCache, TieredBackend  # noqa: E402
+from database import create_tables, engine  # noqa: E402
+from routes.restaurants import router as restaurant_router  # noqa: E402
+
+
+def restaurant_payload(n: int = 0, **fields) -> dict:
+    return {
+        "name": f"Restaurant {n}",
+        "cuisine_type": "Italian",
+        "address": f"{n} Main Street",
+        "phone_number": f"+1555{n:07d}",
+        "opening_time": "09:00",
+        "closing_time": "22:00",
+        **fields,
+    }
+
+
+@pytest.fixture(params=["inmemory", "redis", "tiered"])
+def backend(request):
+    if request.param == "inmemory":
+        return InMemoryBackend()
+    redis = RedisBackend(fakeredis.FakeRedis(decode_responses=True))
+    if request.param == "tiered":
+        # main.py's backend; L1 small enough for tests to push entries out
+        return TieredBackend(redis, LRUCache(maxsize=4, ttl=30))
+    return redis
+
+
+@pytest.fixture
+def client(backend):
+    FastAPICache.init(backend, prefix="zomato-cache")
+    app = FastAPI(on_startup=[create_tables], on_shutdown=[engine.dispose])
+    app.include_router(restaurant_router)
+    with TestClient(app) as client:
+        # InMemoryBackend keeps its entries on the class, its search terms in cache.py
+        client.portal.call(FastAPICache.clear)
+        cache._local_terms.clear()
+        cache_manifest._pending.clear()
+        yield client
+    FastAPICache.reset()
+    # shutdown disposed the pool, so the next test starts from an empty file
+    for path in WORKDIR.glob("restaurants.db*"):
+        path.unlink()
+
+
+@pytest.fixture
+def restaurant_id(client):
+    created = client.post("/restaurants/", json=restaurant_payload()).json()
+    # drop the write-through entry so the first GET below is a miss
+    client.portal.call(FastAPICache.clear)
+    return created["id"]
@@ -32,28 +32,29 @@ async def update_restaurant(
     restaurant_id: int,
     payload: RestaurantUpdate
 ) -> Optional[Restaurant]:
+    values = payload.dict(exclude_unset=True)
+    if not values:
+        return await get_restaurant(db, restaurant_id)
+    # one UPDATE ... RETURNING; a missing id comes back as no row
     stmt = await db.execute(
-        select(Restaurant).where(Restaurant.id == restaurant_id)
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(**values)
+        .returning(Restaurant)
     )
     obj = stmt.scalar_one_or_none()
-    if not obj:
-        return None
-    for k, v in payload.dict(exclude_unset=True).items():
-        setattr(obj, k, v)
     await db.commit()
-    await db.refresh(obj)
     return obj
 
 async def delete_restaurant(
     db: AsyncSession, restaurant_id: int
 ) -> Optional[Restaurant]:
     stmt = await db.execute(
-        select(Restaurant).where(Restaurant.id == restaurant_id)
+        delete(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .returning(Restaurant)
     )
     obj = stmt.scalar_one_or_none()
-    if not obj:
-        return None
-    await db.delete(obj)
     await db.commit()
     return obj
 
@@ -1,13 +1,45 @@
 import os
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
 DATABASE_URL = "sqlite+aiosqlite:///./restaurants.db"
 
+# Engine settings (override through the environment, e.g. SQL_ECHO=true)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",     # readers no longer wait behind the writer
+    "synchronous": "NORMAL",   # fsync at checkpoints only; safe with WAL
+    "mmap_size": 268435456,    # read pages through a 256 MB memory map
+    "cache_size": -64000,      # 64 MB page cache per connection
+    "busy_timeout": 5000,      # wait up to 5s for a lock instead of failing
+    "temp_store": "MEMORY",
+}
+
 engine = create_async_engine(
-    DATABASE_URL, echo=True, future=True
+    DATABASE_URL,
+    echo=SQL_ECHO,
+    future=True,
+    # aiosqlite defaults to NullPool, which opens a new connection per session
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
 )
 
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -16,12 +48,31 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+class LazySession:
+    """Stand-in for an AsyncSession that only creates it on first use.
+
+    Cached endpoints take `db` but never touch it on a hit, so those
+    requests skip creating and closing a session altogether.
+    """
+
+    def __init__(self):
+        self._session = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = AsyncSessionLocal()
+        return getattr(self._session, name)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
 async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+    session = LazySession()
+    try:
+        yield session
+    finally:
+        await session.close()
 
 async def create_tables():
     async with engine.begin() as conn:
@@ -1,13 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse
 import uvicorn
+import asyncio
 import time
 
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
 
-from database import create_tables, get_db
-from routes.restaurants import router as restaurant_router
+import cache_manifest
+import cache_metrics
+import crud
+from cache_backend import LRUCache, TieredBackend, listen_for_invalidations
+from database import create_tables, engine, get_db
+from schemas import RestaurantCreate
+from warmup import warm_up
+from cache import bump_generations
+from routes.restaurants import router as restaurant_router, affected_scopes, read_restaurant
 
 app = FastAPI(
     title="Zomato v2 – Redis Caching (Version 1)",
@@ -23,9 +32,28 @@ async def startup():
     redis = aioredis.from_url(
         "redis://localhost:6379", encoding="utf8", decode_responses=True
     )
-    FastAPICache.init(RedisBackend(redis), prefix="zomato-cache")
+    # L1: per-worker LRU in front of Redis for hot detail/list pages
+    backend = TieredBackend(RedisBackend(redis), LRUCache(maxsize=1024, ttl=30))
+    FastAPICache.init(backend, prefix="zomato-cache")
+    app.state.invalidation_listener = asyncio.create_task(
+        listen_for_invalidations(backend)
+    )
+    app.state.manifest_flusher = asyncio.create_task(
+        cache_manifest.flush_periodically()
+    )
     print("✅ Redis cache initialized")
 
+    # preload hot keys before we start serving traffic
+    app.state.warmup = await warm_up()
+    print(f"🔥 Cache warm-up: {app.state.warmup}")
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.invalidation_listener.cancel()
+    app.state.manifest_flusher.cancel()
+    await cache_manifest.flush()
+    await engine.dispose()
+
 # include our restaurants router
 app.include_router(restaurant_router)
 
@@ -33,12 +61,20 @@ app.include_router(restaurant_router)
 
 @app.get("/cache/stats")
 async def cache_stats():
-    backend = FastAPICache.get_backend().redis
-    keys = await backend.keys("zomato-cache:*")
+    return await collect_cache_stats()
+
+@app.get("/cache/metrics", response_class=PlainTextResponse)
+async def cache_metrics_prometheus():
+    return cache_metrics.to_prometheus(await collect_cache_stats())
+
+async def collect_cache_stats():
+    backend = FastAPICache.get_backend()
     return {
-        "cache_size": len(keys),
-        "cache_keys": keys,
-        "note": "Use redis-cli KEYS for full listing"
+        # SCAN-based estimate, never a full KEYS listing
+        "size": await cache_metrics.estimate_size(backend.redis, FastAPICache.get_prefix()),
+        "routes": cache_metrics.snapshot(),
+        "tiers": backend.stats(),
+        "warmup": getattr(app.state, "warmup", None),
     }
 
 @app.delete("/cache/clear")
@@ -67,10 +103,10 @@ async def create_sample_data(db=Depends(get_db)):
             db, cuisine=data["name"], skip=0, limit=1
         )
         if not any(r.name==data["name"] for r in existing):
-            await crud.create_restaurant(db, RestaurantCreate(**data))
+            new = await crud.create_restaurant(db, RestaurantCreate(**data))
             created.append(data["name"])
-    # invalidate namespace
-    await FastAPICache.clear(namespace="restaurants")
+            await read_restaurant.store(new, restaurant_id=new.id)
+            await bump_generations("restaurants", *await affected_scopes(new))
     return {"created": created}
 
 @app.get("/demo/cache-test/{restaurant_id}")
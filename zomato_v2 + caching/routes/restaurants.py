@@ -1,12 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-import time
-
-from fastapi_cache.decorator import cache
-from fastapi_cache import FastAPICache
 
 import crud
+from cache import cached, bump_generations, collection_scope, entity_scope, matching_terms
 from database import get_db
 from schemas import (
     RestaurantCreate, RestaurantUpdate, RestaurantResponse
@@ -14,69 +11,68 @@ from schemas import (
 
 router = APIRouter(prefix="/restaurants", tags=["restaurants"])
 
+async def affected_scopes(*rows):
+    """Generation scopes of the cached pages that could contain these rows.
+
+    Every row sits on some `/restaurants/` page; `/active` pages only hold
+    active rows and `/search` pages only rows whose cuisine matches.
+    """
+    scopes = [collection_scope("list")]
+    if any(row.is_active for row in rows):
+        scopes.append(collection_scope("active"))
+    terms = await matching_terms("restaurants", "search", {row.cuisine_type for row in rows})
+    scopes.extend(collection_scope("search", term) for term in terms)
+    return scopes
+
 @router.post("/", response_model=RestaurantResponse, status_code=201)
 async def create_restaurant(
     payload: RestaurantCreate,
     db: AsyncSession = Depends(get_db)
 ):
     new = await crud.create_restaurant(db, payload)
-    # clear all restaurant caches
-    await FastAPICache.clear(namespace="restaurants")
+    # write-through also replaces a cached 404 for this id
+    await read_restaurant.store(new, restaurant_id=new.id)
+    await bump_generations("restaurants", *await affected_scopes(new))
     return new
 
 @router.get("/", response_model=List[RestaurantResponse])
-@cache(namespace="restaurants", expire=300)
+@cached(namespace="restaurants", kind="list", expire=600, soft_ttl=300)
 async def read_restaurants(
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
-):
-    start = time.time()
-    items = await crud.get_restaurants(db, skip, limit)
-    delta = (time.time() - start)*1000
-    print(f"🔴 CACHE MISS [list] – {round(delta,2)}ms")
-    return items
-
-@router.get("/{restaurant_id}", response_model=RestaurantResponse)
-@cache(namespace="restaurants", expire=600)
-async def read_restaurant(
-    restaurant_id: int,
-    db: AsyncSession = Depends(get_db)
-):
-    start = time.time()
-    obj = await crud.get_restaurant(db, restaurant_id)
-    if not obj:
-        raise HTTPException(404, "Restaurant not found")
-    delta = (time.time() - start)*1000
-    print(f"🔴 CACHE MISS [detail:{restaurant_id}] – {round(delta,2)}ms")
-    return obj
+) -> List[RestaurantResponse]:
+    return await crud.get_restaurants(db, skip, limit)
 
 @router.get("/search", response_model=List[RestaurantResponse])
-@cache(namespace="restaurants", expire=180)
+@cached(namespace="restaurants", kind="search", expire=360, soft_ttl=180, term_param="cuisine")
 async def search_by_cuisine(
     cuisine: str,
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
-):
-    start = time.time()
-    items = await crud.search_restaurants_by_cuisine(db, cuisine, skip, limit)
-    delta = (time.time() - start)*1000
-    print(f"🔴 CACHE MISS [search:{cuisine}] – {round(delta,2)}ms")
-    return items
+) -> List[RestaurantResponse]:
+    return await crud.search_restaurants_by_cuisine(db, cuisine, skip, limit)
 
 @router.get("/active", response_model=List[RestaurantResponse])
-@cache(namespace="restaurants", expire=240)
+@cached(namespace="restaurants", kind="active", expire=480, soft_ttl=240)
 async def list_active_restaurants(
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
-):
-    start = time.time()
-    items = await crud.get_active_restaurants(db, skip, limit)
-    delta = (time.time() - start)*1000
-    print(f"🔴 CACHE MISS [active] – {round(delta,2)}ms")
-    return items
+) -> List[RestaurantResponse]:
+    return await crud.get_active_restaurants(db, skip, limit)
+
+@router.get("/{restaurant_id}", response_model=RestaurantResponse)
+@cached(namespace="restaurants", kind="detail", expire=600, negative_ttl=30)
+async def read_restaurant(
+    restaurant_id: int,
+    db: AsyncSession = Depends(get_db)
+) -> RestaurantResponse:
+    obj = await crud.get_restaurant(db, restaurant_id)
+    if not obj:
+        raise HTTPException(404, "Restaurant not found")
+    return obj
 
 @router.put("/{restaurant_id}", response_model=RestaurantResponse)
 async def update_restaurant(
@@ -84,12 +80,18 @@ async def update_restaurant(
     payload: RestaurantUpdate,
     db: AsyncSession = Depends(get_db)
 ):
+    before = None
+    if {"cuisine_type", "is_active"} & payload.dict(exclude_unset=True).keys():
+        # the row may leave pages it used to be on
+        existing = await crud.get_restaurant(db, restaurant_id)
+        before = RestaurantResponse.model_validate(existing) if existing else None
     updated = await crud.update_restaurant(db, restaurant_id, payload)
     if not updated:
         raise HTTPException(404, "Restaurant not found")
-    # invalidate detail + list caches
-    await FastAPICache.clear(namespace="restaurants", key=f"read_restaurant:{restaurant_id}")
-    await FastAPICache.clear(namespace="restaurants")
+    # write-through the detail entry, invalidate only affected pages
+    await read_restaurant.store(updated, restaurant_id=restaurant_id)
+    rows = [row for row in (before, updated) if row]
+    await bump_generations("restaurants", *await affected_scopes(*rows))
     return updated
 
 @router.delete("/{restaurant_id}", response_model=RestaurantResponse)
@@ -100,7 +102,8 @@ async def delete_restaurant(
     deleted = await crud.delete_restaurant(db, restaurant_id)
     if not deleted:
         raise HTTPException(404, "Restaurant not found")
-    # invalidate detail + list caches
-    await FastAPICache.clear(namespace="restaurants", key=f"read_restaurant:{restaurant_id}")
-    await FastAPICache.clear(namespace="restaurants")
+    # invalidate detail + affected pages
+    await bump_generations(
+        "restaurants", entity_scope(restaurant_id), *await affected_scopes(deleted)
+    )
     return deleted
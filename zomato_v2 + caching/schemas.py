@@ -21,7 +21,17 @@ class RestaurantCreate(RestaurantBase):
 
 class RestaurantUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=3, max_length=100)
-    # … same fields, all Optional …
+    description: Optional[str] = None
+    cuisine_type: Optional[str] = Field(None, min_length=2, max_length=50)
+    address: Optional[str] = Field(None, min_length=5, max_length=200)
+    phone_number: Optional[str] = Field(
+        None,
+        pattern=r"^\+?[0-9\- ]{7,20}$"
+    )
+    rating: Optional[float] = Field(None, ge=0.0, le=5.0)
+    is_active: Optional[bool] = None
+    opening_time: Optional[time] = None
+    closing_time: Optional[time] = None
 
 class RestaurantResponse(RestaurantBase):
     id: int
@@ -0,0 +1,136 @@
+# test_cache.py
+
+import asyncio
+
+import httpx
+import pytest
+
+import cache
+import crud
+from cache_coder import RenderedResponseCoder
+from conftest import restaurant_payload
+from database import AsyncSessionLocal
+from routes.restaurants import read_restaurant
+from schemas import RestaurantResponse
+
+
+@pytest.fixture
+def get_restaurant_calls(monkeypatch):
+    calls = []
+    get_restaurant = crud.get_restaurant
+
+    async def spy(db, restaurant_id):
+        calls.append(restaurant_id)
+        return await get_restaurant(db, restaurant_id)
+
+    monkeypatch.setattr(crud, "get_restaurant", spy)
+    return calls
+
+
+def test_repeated_reads_hit_the_cache(client, restaurant_id, get_restaurant_calls):
+    responses = [client.get(f"/restaurants/{restaurant_id}") for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert responses[1].json() == responses[0].json()
+    assert get_restaurant_calls == [restaurant_id]
+
+
+def test_write_through_serves_the_new_value(client, restaurant_id, get_restaurant_calls):
+    client.get(f"/restaurants/{restaurant_id}")
+    client.put(f"/restaurants/{restaurant_id}", json={"rating": 4.5})
+
+    assert client.get(f"/restaurants/{restaurant_id}").json()["rating"] == 4.5
+    assert get_restaurant_calls == [restaurant_id]
+
+
+def test_missing_restaurant_is_cached_as_404(client, get_restaurant_calls):
+    responses = [client.get("/restaurants/999") for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [404, 404, 404]
+    assert get_restaurant_calls == [999]
+
+
+def test_search_page_reflects_a_create(client, restaurant_id):
+    url = "/restaurants/search?cuisine=italian"
+    assert len(client.get(url).json()) == 1
+
+    client.post("/restaurants/", json=restaurant_payload(1))
+
+    assert len(client.get("/restaurants/").json()) == 2
+    assert len(client.get(url).json()) == 2
+
+
+def test_concurrent_misses_load_once(client, restaurant_id, get_restaurant_calls, monkeypatch):
+    spy = crud.get_restaurant
+
+    async def slow_get_restaurant(db, restaurant_id):
+        await asyncio.sleep(0.05)  # keep the load in flight while the others arrive
+        return await spy(db, restaurant_id)
+
+    monkeypatch.setattr(crud, "get_restaurant", slow_get_restaurant)
+
+    async def fetch_all():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(
+                *(http.get(f"/restaurants/{restaurant_id}") for _ in range(10))
+            )
+
+    responses = client.portal.call(fetch_all)
+
+    assert [r.status_code for r in responses] == [200] * 10
+    assert get_restaurant_calls == [restaurant_id]
+
+
+def test_waiters_survive_a_cancelled_loader(client):
+    calls = []
+
+    async def load():
+        calls.append(None)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def cancel_the_loader():
+        loader = asyncio.create_task(cache.single_flight("key", load, None))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.single_flight("key", load, None)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        loader.cancel()
+        return await asyncio.gather(*waiters), loader.cancelled()
+
+    results, loader_cancelled = client.portal.call(cancel_the_loader)
+
+    assert loader_cancelled
+    assert results == ["value"] * 3
+    assert len(calls) == 2
+
+
+def test_hit_sends_the_body_rendered_on_the_miss(client, restaurant_id, monkeypatch):
+    calls = []
+    for name in ("encode", "decode"):
+        method = getattr(RenderedResponseCoder, name)
+
+        def spy(self, value, name=name, method=method):
+            calls.append(name)
+            return method(self, value)
+
+        monkeypatch.setattr(RenderedResponseCoder, name, spy)
+
+    miss = client.get(f"/restaurants/{restaurant_id}")
+    hit = client.get(f"/restaurants/{restaurant_id}")
+
+    assert hit.content == miss.content
+    assert hit.headers["content-type"] == "application/json"
+    # rendered once on the miss; the hit neither decodes nor re-validates
+    assert calls == ["encode"]
+
+
+def test_in_process_callers_get_model_objects(client, restaurant_id):
+    async def read():
+        async with AsyncSessionLocal() as db:
+            return await read_restaurant(restaurant_id, db=db)
+
+    miss, hit = client.portal.call(read), client.portal.call(read)
+
+    assert isinstance(hit, RestaurantResponse)
+    assert hit == RestaurantResponse.model_validate(miss, from_attributes=True)
@@ -0,0 +1,122 @@
+# test_cache_backend.py
+
+import asyncio
+
+import pytest
+from fakeredis import aioredis as fakeredis
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis.exceptions import ConnectionError
+
+import cache_backend
+from cache_backend import LRUCache, TieredBackend, listen_for_invalidations
+from conftest import restaurant_payload
+
+
+def test_lru_evicts_the_least_recently_used_entry():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", "1")
+    lru.set("b", "2")
+    lru.get("a")
+    lru.set("c", "3")
+
+    assert lru.get("b") is None
+    assert lru.get("a") == (-1, "1")
+    assert lru.stats()["evictions"] == 1
+
+
+def test_lru_keeps_an_entry_no_longer_than_redis(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache_backend.time, "monotonic", lambda: now)
+    lru = LRUCache(ttl=30)
+    lru.set("key", "value", expire=5)
+
+    now += 6
+    assert lru.get("key") is None
+
+
+@pytest.mark.parametrize("backend", ["tiered"], indirect=True)
+def test_evicted_entries_are_served_from_redis(client):
+    ids = [client.post("/restaurants/", json=restaurant_payload(n)).json()["id"] for n in range(6)]
+    tiered = FastAPICache.get_backend()
+    for restaurant_id in ids:
+        client.get(f"/restaurants/{restaurant_id}")
+    l2_hits = tiered.l2_hits
+
+    assert client.get(f"/restaurants/{ids[0]}").status_code == 200
+    assert tiered.l1.stats()["evictions"] > 0
+    assert tiered.l2_hits > l2_hits
+
+
+async def _until(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def _workers():
+    # two processes' backends: one Redis, an L1 each
+    redis = RedisBackend(fakeredis.FakeRedis(decode_responses=True))
+    return TieredBackend(redis, LRUCache()), TieredBackend(redis, LRUCache())
+
+
+def test_invalidation_drops_other_workers_l1_copies():
+    async def scenario():
+        writer, reader = _workers()
+        listener = asyncio.create_task(listen_for_invalidations(reader))
+        try:
+            await asyncio.sleep(0.05)  # let the listener subscribe
+            await writer.set("ns:detail:1", "old")
+            await writer.set("ns:list:1", "old")
+            assert await reader.get("ns:detail:1") == "old"
+            assert await reader.get("ns:list:1") == "old"
+
+            await writer.clear(key="ns:detail:1")
+            await _until(lambda: reader.l1.get("ns:detail:1") is None)
+            await writer.clear(namespace="ns")
+            await _until(lambda: reader.l1.get("ns:list:1") is None)
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_listener_resubscribes_after_a_dropped_connection(monkeypatch, caplog):
+    monkeypatch.setattr(cache_backend, "RESUBSCRIBE_MIN_DELAY", 0.01)
+
+    async def scenario():
+        writer, reader = _workers()
+        pubsub = reader.redis.pubsub
+        subscriptions = []
+
+        def flaky_pubsub():
+            subscriber = pubsub()
+            subscriptions.append(subscriber)
+            if len(subscriptions) == 1:
+                async def dropped():
+                    raise ConnectionError("Connection closed by server.")
+                    yield
+
+                subscriber.listen = dropped
+            return subscriber
+
+        monkeypatch.setattr(reader.redis, "pubsub", flaky_pubsub)
+        listener = asyncio.create_task(listen_for_invalidations(reader))
+        try:
+            await _until(lambda: len(subscriptions) == 2)
+            await asyncio.sleep(0.05)  # let the second subscription settle
+            await writer.set("ns:detail:1", "old")
+            assert await reader.get("ns:detail:1") == "old"
+
+            await writer.clear(key="ns:detail:1")
+            await _until(lambda: reader.l1.get("ns:detail:1") is None)
+            assert not listener.done()
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert "resubscribing" in caplog.text
@@ -0,0 +1,42 @@
+# test_manifest.py
+
+import pytest
+from fastapi_cache import FastAPICache
+
+import cache_manifest
+import warmup
+
+# warm-up and flush read and write the manifest's sorted sets in Redis
+pytestmark = pytest.mark.parametrize("backend", ["redis", "tiered"], indirect=True)
+
+
+def test_client_reads_are_recorded(client, restaurant_id):
+    client.get(f"/restaurants/{restaurant_id}")
+
+    assert cache_manifest._pending[("restaurants", "detail")] == {
+        f'{{"restaurant_id": "{restaurant_id}"}}': 1
+    }
+
+
+def test_warm_up_does_not_record_its_own_reads(client, restaurant_id):
+    client.get(f"/restaurants/{restaurant_id}")
+    client.portal.call(cache_manifest.flush)
+
+    client.portal.call(warmup.warm_up)
+
+    assert not any(cache_manifest._pending.values())
+
+
+def test_flush_decays_earlier_scores(client):
+    redis = FastAPICache.get_backend().redis
+    key = cache_manifest.manifest_key("restaurants", "search")
+
+    cache_manifest.record_read("restaurants", "search", {"cuisine": "thai"})
+    client.portal.call(cache_manifest.flush)
+    cache_manifest.record_read("restaurants", "search", {"cuisine": "sushi"})
+    client.portal.call(cache_manifest.flush)
+
+    scores = dict(client.portal.call(redis.zrange, key, 0, -1, False, True))
+    assert scores['{"cuisine": "sushi"}'] == 1
+    assert scores['{"cuisine": "thai"}'] == pytest.approx(cache_manifest.DECAY)
+    assert 0 < client.portal.call(redis.ttl, key) <= cache_manifest.MANIFEST_TTL
@@ -0,0 +1,99 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi import HTTPException
+
+import cache_manifest
+from database import AsyncSessionLocal
+from routes.restaurants import (
+    list_active_restaurants,
+    read_restaurant,
+    read_restaurants,
+    search_by_cuisine,
+)
+
+logger = logging.getLogger(__name__)
+
+# Tunable through the environment, e.g. WARMUP_BUDGET_SECONDS=5
+WARMUP_LIST_PAGES = int(os.getenv("WARMUP_LIST_PAGES", "5"))
+WARMUP_PAGE_SIZE = int(os.getenv("WARMUP_PAGE_SIZE", "100"))
+WARMUP_TOP_CUISINES = int(os.getenv("WARMUP_TOP_CUISINES", "10"))
+WARMUP_TOP_DETAILS = int(os.getenv("WARMUP_TOP_DETAILS", "200"))
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "8"))
+WARMUP_BUDGET_SECONDS = float(os.getenv("WARMUP_BUDGET_SECONDS", "10"))
+
+Job = Tuple[Callable[..., Any], Dict[str, Any]]
+
+
+def _from_manifest(func: Callable, params: Dict[str, str]) -> Dict[str, Any]:
+    """Turn recorded (string) params back into the endpoint's types."""
+    signature = inspect.signature(func)
+    kwargs = {}
+    for name, value in params.items():
+        annotation = signature.parameters[name].annotation
+        if annotation is bool:
+            kwargs[name] = value == "true"
+        elif annotation in (int, float):
+            kwargs[name] = annotation(value)
+        else:
+            kwargs[name] = value
+    return kwargs
+
+
+async def plan() -> List[Job]:
+    jobs: List[Job] = [
+        (read_restaurants, {"skip": page * WARMUP_PAGE_SIZE, "limit": WARMUP_PAGE_SIZE})
+        for page in range(WARMUP_LIST_PAGES)
+    ]
+    jobs.append((list_active_restaurants, {}))
+    for func, kind, n in (
+        (search_by_cuisine, "search", WARMUP_TOP_CUISINES),
+        (read_restaurant, "detail", WARMUP_TOP_DETAILS),
+    ):
+        for params in await cache_manifest.top("restaurants", kind, n):
+            jobs.append((func, _from_manifest(func, params)))
+    return jobs
+
+
+async def warm_up() -> Dict[str, Any]:
+    """Preload hot list pages and manifest keys through the cached endpoints.
+
+    Runs at most WARMUP_CONCURRENCY loads at once and gives up on whatever
+    is left after WARMUP_BUDGET_SECONDS.
+    """
+    start = time.perf_counter()
+    jobs = await plan()
+    semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    failed = 0
+
+    async def run(func: Callable[..., Any], kwargs: Dict[str, Any]) -> None:
+        nonlocal failed
+        async with semaphore:
+            async with AsyncSessionLocal() as session:
+                try:
+                    await func(**kwargs, db=session)
+                except HTTPException:
+                    pass  # e.g. a deleted id; the 404 is cached too
+                except Exception:
+                    failed += 1
+                    logger.warning(f"Warm-up of {func.__name__}{kwargs} failed:", exc_info=True)
+
+    tasks = [asyncio.create_task(run(func, kwargs)) for func, kwargs in jobs]
+    pending = set()
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=WARMUP_BUDGET_SECONDS)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    return {
+        "planned": len(jobs),
+        "warmed": len(jobs) - len(pending) - failed,
+        "failed": failed,
+        "timed_out": len(pending),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
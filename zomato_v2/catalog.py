@@ -0,0 +1,456 @@
+# catalog.py
+#
+# Optional in-memory catalog snapshot for read-heavy deployments
+# (CATALOG_SNAPSHOT=true). At startup every restaurant and menu item is
+# copied into slotted records, indexed by id, category and restaurant_id,
+# and the GET routes read from those instead of SQLite. Writes still go to
+# SQLite: triggers note each inserted, updated or deleted row in
+# `catalog_changes` under an increasing sequence number, and the snapshot
+# re-reads just those rows past its watermark - every
+# CATALOG_REFRESH_SECONDS, and before the next read after a commit made by
+# this process, so a client always sees its own writes.
+
+import asyncio
+import logging
+import os
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+import crud
+from database import AsyncSessionLocal, engine
+from models import MenuItem, Restaurant
+
+logger = logging.getLogger(__name__)
+
+# Off unless CATALOG_SNAPSHOT=true
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+CATALOG_REFRESH_SECONDS = float(os.getenv("CATALOG_REFRESH_SECONDS", "1.0"))
+
+# Changed rows are re-read with IN lists of this many ids
+REFRESH_CHUNK_SIZE = 500
+
+CHANGE_LOG_TABLES = ("restaurants", "menu_items")
+
+
+async def _begin_read(db) -> None:
+    """Read everything that follows from one database snapshot.
+
+    pysqlite only opens a transaction before a write, so each SELECT would
+    otherwise see the database as of its own start, and a menu item could
+    arrive without the restaurant it belongs to. Closing the session rolls
+    the read transaction back.
+    """
+    await db.execute(text("BEGIN"))
+
+
+# ─────────── Change log ───────────
+#
+# One row per changed (table, id), replaced on every change, so the log
+# never grows past the number of rows ever written.
+
+def _change_log_ddl() -> List[str]:
+    statements = [
+        "CREATE TABLE IF NOT EXISTS catalog_changes ("
+        "table_name TEXT NOT NULL, row_id INTEGER NOT NULL, seq INTEGER NOT NULL, "
+        "PRIMARY KEY (table_name, row_id)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS ix_catalog_changes_seq ON catalog_changes (seq)",
+    ]
+    for table_name in CHANGE_LOG_TABLES:
+        # deletes cascaded from a restaurant fire the menu_items trigger too
+        for action, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS catalog_changes_{table_name}_a{action[0].lower()} "
+                f"AFTER {action} ON {table_name} BEGIN "
+                "INSERT OR REPLACE INTO catalog_changes (table_name, row_id, seq) "
+                f"VALUES ('{table_name}', {row}.id, "
+                "(SELECT coalesce(max(seq), 0) + 1 FROM catalog_changes)); END"
+            )
+    return statements
+
+# ─────────── Records ───────────
+
+# Low-cardinality columns: rows share one object per distinct value
+_SHARED_COLUMNS = ("cuisine_type", "opening_time", "closing_time", "category", "price")
+_shared_values: Dict[str, dict] = {name: {} for name in _SHARED_COLUMNS}
+
+class _Record:
+    """Plain copy of one table row; slots instead of a __dict__ per row."""
+    __slots__ = ()
+
+    def __init__(self, row):
+        for name, value in zip(self.__slots__, row):
+            if name in _shared_values:
+                value = _shared_values[name].setdefault(value, value)
+            setattr(self, name, value)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class RestaurantRecord(_Record):
+    __slots__ = tuple(Restaurant.__table__.columns.keys())
+
+class MenuItemRecord(_Record):
+    __slots__ = tuple(MenuItem.__table__.columns.keys())
+
+def _rating_key(rating, restaurant_id: int) -> Tuple[float, int]:
+    # the `rating` sort order, NULL ratings last when read high-to-low
+    return (float("-inf") if rating is None else rating, restaurant_id)
+
+def _page(skip: int, limit: int) -> Tuple[int, Optional[int]]:
+    # as SQLite reads OFFSET/LIMIT: a negative offset is 0, a negative limit is none
+    return max(skip, 0), (limit if limit >= 0 else None)
+
+def _is_key(after: Tuple) -> bool:
+    # sort keys are numbers; a cursor holding text sorts after every id in
+    # SQL, so the page past it is empty (and bisect would raise TypeError)
+    return all(isinstance(value, (int, float)) for value in after)
+
+# ─────────── Snapshot ───────────
+
+class CatalogSnapshot:
+    """Restaurants and menu items held in memory.
+
+    The read methods mirror the crud functions the GET routes use (same
+    arguments, `db` ignored), so a route can be handed either one.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        self.dirty = False
+        self.watermark = 0
+        self.restaurants: Dict[int, RestaurantRecord] = {}
+        self.menu_items: Dict[int, MenuItemRecord] = {}
+        # sorted keys for paging
+        self._restaurant_ids: List[int] = []
+        self._ratings: List[Tuple[float, int]] = []
+        self._menu_item_ids: List[int] = []
+        # restaurant_id -> sorted menu item ids; lower-cased category -> ids
+        self._menus: Dict[int, List[int]] = {}
+        self._categories: Dict[str, Set[int]] = {}
+        # collection max(updated_at), dropped whenever anything changes
+        self._latest: Dict[str, Optional[datetime]] = {}
+        self._lock: Optional[asyncio.Lock] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    # ── lifecycle ──
+
+    async def start(self) -> None:
+        self._lock = asyncio.Lock()
+        async with engine.begin() as conn:
+            for statement in _change_log_ddl():
+                await conn.execute(text(statement))
+        await self.load()
+        event.listen(Session, "after_commit", self._after_commit)
+        self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+        if event.contains(Session, "after_commit", self._after_commit):
+            event.remove(Session, "after_commit", self._after_commit)
+        self.loaded = False
+
+    def _after_commit(self, session) -> None:
+        self.dirty = True
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(CATALOG_REFRESH_SECONDS)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Catalog refresh failed")
+
+    async def load(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await _begin_read(db)
+            # watermark first: a change that lands during the load is
+            # replayed by the next refresh, which re-reads the row as it is
+            self.watermark = (await db.execute(
+                text("SELECT coalesce(max(seq), 0) FROM catalog_changes")
+            )).scalar_one()
+            restaurants = (await db.execute(select(Restaurant.__table__))).all()
+            menu_items = (await db.execute(select(MenuItem.__table__))).all()
+        for row in restaurants:
+            self._put_restaurant(RestaurantRecord(row))
+        for row in menu_items:
+            self._put_menu_item(MenuItemRecord(row))
+        self.loaded = True
+        logger.info(
+            f"Catalog snapshot: {len(self.restaurants)} restaurants, "
+            f"{len(self.menu_items)} menu items"
+        )
+
+    async def refresh(self) -> int:
+        """Apply changes past the watermark; returns how many rows changed."""
+        async with self._lock:
+            self.dirty = False
+            async with AsyncSessionLocal() as db:
+                await _begin_read(db)
+                changes = (await db.execute(
+                    text("SELECT table_name, row_id, seq FROM catalog_changes "
+                         "WHERE seq > :seq"),
+                    {"seq": self.watermark}
+                )).all()
+                if not changes:
+                    return 0
+                changed: Dict[str, List[int]] = {name: [] for name in CHANGE_LOG_TABLES}
+                for table_name, row_id, _ in changes:
+                    changed[table_name].append(row_id)
+                restaurants = await self._fetch(db, Restaurant, changed["restaurants"])
+                menu_items = await self._fetch(db, MenuItem, changed["menu_items"])
+
+            # no awaits from here on: readers never see a half-applied batch
+            for restaurant_id in changed["restaurants"]:
+                row = restaurants.get(restaurant_id)
+                if row is None:
+                    self._drop_restaurant(restaurant_id)
+                else:
+                    self._put_restaurant(RestaurantRecord(row))
+            for item_id in changed["menu_items"]:
+                row = menu_items.get(item_id)
+                if row is None:
+                    self._drop_menu_item(item_id)
+                else:
+                    self._put_menu_item(MenuItemRecord(row))
+            self.watermark = max(seq for _, _, seq in changes)
+            return len(changes)
+
+    @staticmethod
+    async def _fetch(db, model, ids: List[int]) -> Dict[int, tuple]:
+        # rows missing from the result were deleted
+        rows = {}
+        for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+            result = await db.execute(
+                select(model.__table__)
+                .where(model.id.in_(ids[start:start + REFRESH_CHUNK_SIZE]))
+                .execution_options(batch=True)
+            )
+            rows.update((row.id, row) for row in result)
+        return rows
+
+    # ── index maintenance ──
+
+    def _put_restaurant(self, record: RestaurantRecord) -> None:
+        old = self.restaurants.get(record.id)
+        if old is None:
+            insort(self._restaurant_ids, record.id)
+        else:
+            self._ratings.pop(bisect_left(self._ratings, _rating_key(old.rating, old.id)))
+        insort(self._ratings, _rating_key(record.rating, record.id))
+        self.restaurants[record.id] = record
+        self._latest.clear()
+
+    def _drop_restaurant(self, restaurant_id: int) -> None:
+        old = self.restaurants.pop(restaurant_id, None)
+        if old is None:
+            return
+        del self._restaurant_ids[bisect_left(self._restaurant_ids, restaurant_id)]
+        self._ratings.pop(bisect_left(self._ratings, _rating_key(old.rating, old.id)))
+        self._latest.clear()
+
+    def _put_menu_item(self, record: MenuItemRecord) -> None:
+        if record.id in self.menu_items:
+            self._unindex_menu_item(self.menu_items[record.id])
+        else:
+            insort(self._menu_item_ids, record.id)
+        self.menu_items[record.id] = record
+        insort(self._menus.setdefault(record.restaurant_id, []), record.id)
+        self._categories.setdefault(record.category.lower(), set()).add(record.id)
+        self._latest.clear()
+
+    def _drop_menu_item(self, item_id: int) -> None:
+        old = self.menu_items.pop(item_id, None)
+        if old is None:
+            return
+        self._unindex_menu_item(old)
+        del self._menu_item_ids[bisect_left(self._menu_item_ids, item_id)]
+        self._latest.clear()
+
+    def _unindex_menu_item(self, old: MenuItemRecord) -> None:
+        menu = self._menus[old.restaurant_id]
+        del menu[bisect_left(menu, old.id)]
+        if not menu:
+            del self._menus[old.restaurant_id]
+        ids = self._categories[old.category.lower()]
+        ids.discard(old.id)
+        if not ids:
+            del self._categories[old.category.lower()]
+
+    def _latest_update(self, name: str, records) -> Optional[datetime]:
+        if name not in self._latest:
+            self._latest[name] = max((r.updated_at for r in records), default=None)
+        return self._latest[name]
+
+    # ── reads (same signatures as crud) ──
+
+    async def get_restaurant(self, db, restaurant_id: int) -> Optional[RestaurantRecord]:
+        return self.restaurants.get(restaurant_id)
+
+    async def get_restaurants(
+        self,
+        db,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple] = None,
+        sort: str = "id"
+    ) -> List[RestaurantRecord]:
+        if after and not _is_key(after):
+            return []
+        skip, limit = _page(skip, limit)
+        if sort == "rating":
+            # (rating, id) high-to-low: walk the ascending keys backwards
+            keys = self._ratings
+            end = bisect_left(keys, _rating_key(*after)) if after else len(keys) - skip
+            start = 0 if limit is None else end - limit
+            page = keys[max(start, 0):max(end, 0)]
+            return [self.restaurants[restaurant_id] for _, restaurant_id in reversed(page)]
+        ids = self._restaurant_ids
+        start = bisect_right(ids, after[0]) if after else skip
+        end = None if limit is None else start + limit
+        return [self.restaurants[i] for i in ids[start:end]]
+
+    async def get_menu_item(self, db, item_id: int) -> Optional[MenuItemRecord]:
+        return self.menu_items.get(item_id)
+
+    async def get_menu_item_with_restaurant(self, db, item_id: int) -> Optional[dict]:
+        item = self.menu_items.get(item_id)
+        restaurant = self.restaurants.get(item.restaurant_id) if item else None
+        if restaurant is None:
+            return None
+        return {**item.as_dict(), "restaurant": restaurant}
+
+    async def get_all_menu_items(
+        self,
+        db,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple] = None
+    ) -> List[MenuItemRecord]:
+        if after and not _is_key(after):
+            return []
+        skip, limit = _page(skip, limit)
+        ids = self._menu_item_ids
+        start = bisect_right(ids, after[0]) if after else skip
+        end = None if limit is None else start + limit
+        return [self.menu_items[i] for i in ids[start:end]]
+
+    async def search_menu_items(
+        self,
+        db,
+        category: Optional[str] = None,
+        vegetarian: Optional[bool] = None,
+        vegan: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple] = None,
+        min_price: Optional[Decimal] = None,
+        max_price: Optional[Decimal] = None,
+        min_prep_time: Optional[int] = None,
+        max_prep_time: Optional[int] = None
+    ) -> List[MenuItemRecord]:
+        skip, limit = _page(skip, limit)
+        if limit == 0 or (after and not _is_key(after)):
+            return []
+        if category:
+            # substring match like ILIKE '%category%', over distinct categories
+            needle = category.lower()
+            ids = sorted(
+                item_id
+                for name, item_ids in self._categories.items() if needle in name
+                for item_id in item_ids
+            )
+        else:
+            ids = self._menu_item_ids
+
+        page: List[MenuItemRecord] = []
+        to_skip = 0 if after else skip
+        for position in range(bisect_right(ids, after[0]) if after else 0, len(ids)):
+            item = self.menu_items[ids[position]]
+            if (
+                (vegetarian is not None and item.is_vegetarian != vegetarian)
+                or (vegan is not None and item.is_vegan != vegan)
+                or (min_price is not None and item.price < min_price)
+                or (max_price is not None and item.price > max_price)
+                or (min_prep_time is not None and item.preparation_time < min_prep_time)
+                or (max_prep_time is not None and item.preparation_time > max_prep_time)
+            ):
+                continue
+            if to_skip:
+                to_skip -= 1
+                continue
+            page.append(item)
+            if len(page) == limit:
+                break
+        return page
+
+    async def get_menu_for_restaurant(self, db, restaurant_id: int) -> List[MenuItemRecord]:
+        return [self.menu_items[i] for i in self._menus.get(restaurant_id, ())]
+
+    async def get_restaurant_with_menu(self, db, restaurant_id: int) -> Optional[dict]:
+        restaurant = self.restaurants.get(restaurant_id)
+        if restaurant is None:
+            return None
+        return {
+            **restaurant.as_dict(),
+            "menu_items": await self.get_menu_for_restaurant(db, restaurant_id)
+        }
+
+    # ── versions (for ETag / Last-Modified) ──
+
+    async def get_restaurant_version(self, db, restaurant_id: int) -> Optional[datetime]:
+        restaurant = self.restaurants.get(restaurant_id)
+        return restaurant.updated_at if restaurant else None
+
+    async def get_restaurants_version(self, db) -> Tuple[int, Optional[datetime]]:
+        return (
+            len(self.restaurants),
+            self._latest_update("restaurants", self.restaurants.values())
+        )
+
+    async def get_menu_item_version(self, db, item_id: int) -> Optional[datetime]:
+        item = self.menu_items.get(item_id)
+        return item.updated_at if item else None
+
+    async def get_menu_items_version(
+        self,
+        db,
+        restaurant_id: Optional[int] = None
+    ) -> Tuple[int, Optional[datetime]]:
+        if restaurant_id is None:
+            return (
+                len(self.menu_items),
+                self._latest_update("menu_items", self.menu_items.values())
+            )
+        menu = self._menus.get(restaurant_id, ())
+        latest = max((self.menu_items[i].updated_at for i in menu), default=None)
+        return len(menu), latest
+
+    async def get_restaurant_with_menu_version(
+        self,
+        db,
+        restaurant_id: int
+    ) -> Optional[Tuple[datetime, int, Optional[datetime]]]:
+        restaurant = self.restaurants.get(restaurant_id)
+        if restaurant is None:
+            return None
+        return (restaurant.updated_at, *await self.get_menu_items_version(db, restaurant_id))
+
+
+
+snapshot = CatalogSnapshot()
+
+
+async def get_reader():
+    """Dependency for GET routes: the snapshot in catalog mode, else crud."""
+    if snapshot.loaded:
+        if snapshot.dirty:
+            await snapshot.refresh()
+        return snapshot
+    return crud
@@ -0,0 +1,60 @@
+# conftest.py
+#
+# Each test runs the app against a fresh SQLite file. DATABASE_URL is
+# relative, and SQLAlchemy resolves it when the engine is created, so the
+# tests move to a scratch directory before importing the app.
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="zomato-v2-tests-"))
+os.chdir(WORKDIR)
+
+from main import app  # noqa: E402
+
+
+def restaurant_payload(n: int = 0, **fields) -> dict:
+    return {
+        "name": f"Restaurant {n}",
+        "cuisine_type": "Italian",
+        "address": f"{n} Main Street",
+        "phone_number": f"+1555{n:07d}",
+        "rating": 4.0,
+        "opening_time": "09:00",
+        "closing_time": "22:00",
+        **fields,
+    }
+
+
+def menu_item_payload(n: int = 0, **fields) -> dict:
+    return {
+        "name": f"Dish {n}",
+        "price": "9.50",
+        "category": "Main",
+        "preparation_time": 15,
+        **fields,
+    }
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+    # shutdown disposed the pool, so the next test starts from an empty file
+    for path in WORKDIR.glob("restaurants.db*"):
+        path.unlink()
+
+
+@pytest.fixture
+def restaurant(client):
+    """A restaurant with two menu items."""
+    created = client.post("/restaurants/", json=restaurant_payload()).json()
+    for n in range(2):
+        client.post(
+            f"/restaurants/{created['id']}/menu-items/", json=menu_item_payload(n)
+        )
+    return created
@@ -1,12 +1,180 @@
-# crud.py (add after existing Restaurant CRUD)
+# crud.py
 
-from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
-from models import MenuItem, Restaurant
-from schemas import MenuItemCreate, MenuItemUpdate
+from sqlalchemy import and_, select, update, delete, func, literal_column, text, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql import Select
+from models import MenuItem, Restaurant, utc_now
+from hours_index import restaurant_open_hours
+from search_index import match_query, menu_items_fts, restaurants_fts
+from schemas import (
+    RestaurantCreate,
+    RestaurantUpdate,
+    MenuItemCreate,
+    MenuItemUpdate
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from decimal import Decimal
+from datetime import datetime
+
+# ─────────── Keyset pagination ───────────
+
+# Sort orders for keyset pagination: the columns a cursor holds (the last
+# one is always the unique id) and whether pages run high-to-low.
+RESTAURANT_SORTS = {
+    "id": ((Restaurant.id,), False),
+    "rating": ((Restaurant.rating, Restaurant.id), True),
+}
+
+def paginate(
+    stmt: Select,
+    columns: Sequence,
+    descending: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> Select:
+    """Order `stmt` by `columns` and cut one page out of it.
+
+    With `after` (a decoded cursor) the page starts right past that sort key,
+    which an index on `columns` answers without scanning earlier rows.
+    Without it this falls back to OFFSET `skip`.
+    """
+    stmt = stmt.order_by(*(c.desc() if descending else c for c in columns))
+    if after is not None:
+        key, value = tuple_(*columns), tuple_(*after)
+        stmt = stmt.where(key < value if descending else key > value)
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+# ─────────── Restaurant CRUD ───────────
+
+async def create_restaurant(
+    db: AsyncSession,
+    restaurant: RestaurantCreate
+) -> Restaurant:
+    db_restaurant = Restaurant(**restaurant.dict())
+    db.add(db_restaurant)
+    await db.commit()
+    await db.refresh(db_restaurant)
+    return db_restaurant
+
+async def get_restaurant(
+    db: AsyncSession,
+    restaurant_id: int
+) -> Optional[Restaurant]:
+    result = await db.execute(
+        select(Restaurant).where(Restaurant.id == restaurant_id)
+    )
+    return result.scalar_one_or_none()
+
+async def get_restaurants(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None,
+    sort: str = "id"
+) -> List[Restaurant]:
+    columns, descending = RESTAURANT_SORTS[sort]
+    result = await db.execute(
+        paginate(select(Restaurant), columns, descending, skip, limit, after)
+    )
+    return result.scalars().all()
+
+async def update_restaurant(
+    db: AsyncSession,
+    restaurant_id: int,
+    restaurant_update: RestaurantUpdate
+) -> Optional[Restaurant]:
+    update_data = restaurant_update.dict(exclude_unset=True)
+    if not update_data:
+        return await get_restaurant(db, restaurant_id)
+
+    # One UPDATE ... RETURNING; a missing id comes back as no row
+    result = await db.execute(
+        update(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .values(**update_data)
+        .returning(Restaurant)
+    )
+    db_restaurant = result.scalar_one_or_none()
+    await db.commit()
+    return db_restaurant
+
+async def delete_restaurant(
+    db: AsyncSession,
+    restaurant_id: int
+) -> Optional[Restaurant]:
+    result = await db.execute(
+        delete(Restaurant)
+        .where(Restaurant.id == restaurant_id)
+        .returning(Restaurant)
+    )
+    db_restaurant = result.scalar_one_or_none()
+    await db.commit()
+    return db_restaurant
+
+async def search_restaurants_by_cuisine(
+    db: AsyncSession,
+    cuisine: str,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> List[Restaurant]:
+    result = await db.execute(
+        paginate(
+            select(Restaurant).where(Restaurant.cuisine_type.ilike(f"%{cuisine}%")),
+            (Restaurant.id,), skip=skip, limit=limit, after=after
+        )
+    )
+    return result.scalars().all()
+
+async def get_active_restaurants(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> List[Restaurant]:
+    result = await db.execute(
+        paginate(
+            select(Restaurant).where(Restaurant.is_active == True),
+            (Restaurant.id,), skip=skip, limit=limit, after=after
+        )
+    )
+    return result.scalars().all()
+
+async def get_open_restaurants(
+    db: AsyncSession,
+    minute: int,
+    cuisine: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None
+) -> List[Restaurant]:
+    # Walk the index rows for this clock hour in restaurant id order and
+    # keep those whose interval holds `minute` exactly; a restaurant's
+    # intervals never overlap, so each appears at most once
+    hours = restaurant_open_hours.c
+    stmt = (
+        select(Restaurant)
+        .join(restaurant_open_hours, hours.restaurant_id == Restaurant.id)
+        .where(
+            hours.hour == minute // 60,
+            hours.start_minute <= minute,
+            hours.end_minute > minute,
+            Restaurant.is_active == True
+        )
+    )
+    if cuisine:
+        stmt = stmt.where(Restaurant.cuisine_type.ilike(f"%{cuisine}%"))
+    result = await db.execute(
+        paginate(stmt, (hours.restaurant_id,), skip=skip, limit=limit, after=after)
+    )
+    return result.scalars().all()
+
+# ─────────── MenuItem CRUD ───────────
 
 async def create_menu_item(
     db: AsyncSession,
@@ -35,13 +203,26 @@ async def get_menu_item(
     )
     return result.scalar_one_or_none()
 
+async def get_menu_item_with_restaurant(
+    db: AsyncSession,
+    item_id: int
+) -> Optional[MenuItem]:
+    # Many-to-one: one JOIN beats a second SELECT
+    result = await db.execute(
+        select(MenuItem)
+        .options(joinedload(MenuItem.restaurant))
+        .where(MenuItem.id == item_id)
+    )
+    return result.scalar_one_or_none()
+
 async def get_all_menu_items(
     db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[Tuple] = None
 ) -> List[MenuItem]:
     result = await db.execute(
-        select(MenuItem).offset(skip).limit(limit)
+        paginate(select(MenuItem), (MenuItem.id,), skip=skip, limit=limit, after=after)
     )
     return result.scalars().all()
 
@@ -50,51 +231,80 @@ async def update_menu_item(
     item_id: int,
     item_update: MenuItemUpdate
 ) -> Optional[MenuItem]:
-    # Fetch existing
-    res = await db.execute(select(MenuItem).where(MenuItem.id == item_id))
-    db_item = res.scalar_one_or_none()
-    if not db_item:
-        return None
-
-    # Apply changes
     update_data = item_update.dict(exclude_unset=True)
-    for field, val in update_data.items():
-        setattr(db_item, field, val)
+    if not update_data:
+        res = await db.execute(select(MenuItem).where(MenuItem.id == item_id))
+        return res.scalar_one_or_none()
 
+    # One UPDATE ... RETURNING; a missing id comes back as no row
+    res = await db.execute(
+        update(MenuItem)
+        .where(MenuItem.id == item_id)
+        .values(**update_data)
+        .returning(MenuItem)
+    )
+    db_item = res.scalar_one_or_none()
     await db.commit()
-    await db.refresh(db_item)
     return db_item
 
 async def delete_menu_item(
     db: AsyncSession,
     item_id: int
 ) -> Optional[MenuItem]:
-    res = await db.execute(select(MenuItem).where(MenuItem.id == item_id))
+    res = await db.execute(
+        delete(MenuItem)
+        .where(MenuItem.id == item_id)
+        .returning(MenuItem)
+    )
     db_item = res.scalar_one_or_none()
-    if not db_item:
-        return None
-    await db.delete(db_item)
     await db.commit()
     return db_item
 
-async def search_menu_items(
-    db: AsyncSession,
+def _menu_item_filters(
     category: Optional[str] = None,
     vegetarian: Optional[bool] = None,
     vegan: Optional[bool] = None,
-    skip: int = 0,
-    limit: int = 100
-) -> List[MenuItem]:
-    # Build base query
-    stmt = select(MenuItem)
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    min_prep_time: Optional[int] = None,
+    max_prep_time: Optional[int] = None
+) -> list:
+    # WHERE clauses shared by the result page and its facet counts
+    filters = []
     if category:
-        stmt = stmt.where(MenuItem.category.ilike(f"%{category}%"))
+        filters.append(MenuItem.category.ilike(f"%{category}%"))
     if vegetarian is not None:
-        stmt = stmt.where(MenuItem.is_vegetarian == vegetarian)
+        filters.append(MenuItem.is_vegetarian == vegetarian)
     if vegan is not None:
-        stmt = stmt.where(MenuItem.is_vegan == vegan)
+        filters.append(MenuItem.is_vegan == vegan)
+    if min_price is not None:
+        filters.append(MenuItem.price >= min_price)
+    if max_price is not None:
+        filters.append(MenuItem.price <= max_price)
+    if min_prep_time is not None:
+        filters.append(MenuItem.preparation_time >= min_prep_time)
+    if max_prep_time is not None:
+        filters.append(MenuItem.preparation_time <= max_prep_time)
+    return filters
 
-    stmt = stmt.offset(skip).limit(limit)
+async def search_menu_items(
+    db: AsyncSession,
+    category: Optional[str] = None,
+    vegetarian: Optional[bool] = None,
+    vegan: Optional[bool] = None,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    min_prep_time: Optional[int] = None,
+    max_prep_time: Optional[int] = None
+) -> List[MenuItem]:
+    stmt = select(MenuItem).where(*_menu_item_filters(
+        category, vegetarian, vegan,
+        min_price, max_price, min_prep_time, max_prep_time
+    ))
+    stmt = paginate(stmt, (MenuItem.id,), skip=skip, limit=limit, after=after)
     result = await db.execute(stmt)
     return result.scalars().all()
 
@@ -119,3 +329,246 @@ async def get_restaurant_with_menu(
         .where(Restaurant.id == restaurant_id)
     )
     return result.scalar_one_or_none()
+
+# ─────────── Bulk writes ───────────
+#
+# One multi-row INSERT per chunk, all chunks in a single transaction.
+# 500 rows x 9 columns stays well under SQLite's bound-parameter limit.
+
+BULK_CHUNK_SIZE = 500
+
+async def bulk_upsert_restaurants(
+    db: AsyncSession,
+    restaurants: List[RestaurantCreate]
+) -> List[Tuple[int, bool]]:
+    """Insert restaurants, updating any whose phone number already exists.
+
+    Returns `(id, created)` per input row, in input order. Phone numbers
+    must be unique within the batch.
+    """
+    # Take the write lock before looking up existing phones: pysqlite only
+    # begins at the INSERT, and a row another writer committed in between
+    # would be reported as created here although this upsert updated it.
+    await db.execute(text("BEGIN IMMEDIATE"))
+    results: List[Tuple[int, bool]] = []
+    for start in range(0, len(restaurants), BULK_CHUNK_SIZE):
+        rows = [r.dict() for r in restaurants[start:start + BULK_CHUNK_SIZE]]
+        phones = [row["phone_number"] for row in rows]
+        existing = set((await db.execute(
+            select(Restaurant.phone_number)
+            .where(Restaurant.phone_number.in_(phones))
+            .execution_options(batch=True)
+        )).scalars())
+
+        stmt = sqlite_insert(Restaurant).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Restaurant.phone_number],
+            set_={
+                **{name: stmt.excluded[name] for name in rows[0] if name != "phone_number"},
+                "updated_at": utc_now(),
+            }
+        )
+        # RETURNING order is unspecified, so match rows back by phone number
+        returned: Dict[str, int] = dict((await db.execute(
+            stmt.returning(Restaurant.phone_number, Restaurant.id)
+        )).all())
+        results.extend((returned[phone], phone not in existing) for phone in phones)
+    await db.commit()
+    return results
+
+async def bulk_create_menu_items(
+    db: AsyncSession,
+    restaurant_id: int,
+    items: List[MenuItemCreate]
+) -> Optional[List[int]]:
+    """Insert menu items for one restaurant; None if it does not exist.
+
+    Menu items have no natural unique key to upsert on, so this is a plain
+    multi-row INSERT. Returns the new ids in input order.
+    """
+    if await db.get(Restaurant, restaurant_id) is None:
+        return None
+    ids: List[int] = []
+    for start in range(0, len(items), BULK_CHUNK_SIZE):
+        rows = [
+            {**item.dict(), "restaurant_id": restaurant_id}
+            for item in items[start:start + BULK_CHUNK_SIZE]
+        ]
+        returned = await db.execute(
+            sqlite_insert(MenuItem).values(rows).returning(MenuItem.id)
+        )
+        # one statement from the only writer: rowids are consecutive in input order
+        ids.extend(sorted(returned.scalars()))
+    await db.commit()
+    return ids
+
+# ─────────── Full-text search ───────────
+#
+# Ranked with BM25; a hit in the name counts more than one in the
+# cuisine/category, which counts more than one in the description.
+
+async def search_restaurants(
+    db: AsyncSession,
+    q: str,
+    limit: int = 20
+) -> List[Restaurant]:
+    match = match_query(q)
+    if not match:
+        return []
+    fts = literal_column("restaurants_fts")
+    result = await db.execute(
+        select(Restaurant)
+        .join(restaurants_fts, restaurants_fts.c.rowid == Restaurant.id)
+        .where(fts.op("MATCH")(match))
+        .order_by(func.bm25(fts, 10.0, 1.0, 5.0))
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def search_menu_items_text(
+    db: AsyncSession,
+    q: str,
+    limit: int = 20
+) -> List[MenuItem]:
+    match = match_query(q)
+    if not match:
+        return []
+    fts = literal_column("menu_items_fts")
+    result = await db.execute(
+        select(MenuItem)
+        .join(menu_items_fts, menu_items_fts.c.rowid == MenuItem.id)
+        .where(fts.op("MATCH")(match))
+        .order_by(func.bm25(fts, 10.0, 1.0, 5.0))
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+# ─────────── Facet counts ───────────
+#
+# Every facet of a menu search comes from one GROUP BY category query:
+# each row carries that category's total plus FILTER-ed counts for the
+# dietary/availability flags and price buckets, and the per-category
+# rows are summed here. Counts cover all matches, not just one page.
+
+# Price buckets as (label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = (
+    ("under_100", None, 100),
+    ("100_to_250", 100, 250),
+    ("250_to_500", 250, 500),
+    ("500_and_above", 500, None),
+)
+
+def _price_bucket(low, high):
+    bounds = []
+    if low is not None:
+        bounds.append(MenuItem.price >= low)
+    if high is not None:
+        bounds.append(MenuItem.price < high)
+    return and_(*bounds)
+
+async def get_menu_item_facets(
+    db: AsyncSession,
+    category: Optional[str] = None,
+    vegetarian: Optional[bool] = None,
+    vegan: Optional[bool] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    min_prep_time: Optional[int] = None,
+    max_prep_time: Optional[int] = None
+) -> Dict:
+    stmt = (
+        select(
+            MenuItem.category,
+            func.count(),
+            func.count().filter(MenuItem.is_vegetarian),
+            func.count().filter(MenuItem.is_vegan),
+            func.count().filter(MenuItem.is_available),
+            *(func.count().filter(_price_bucket(low, high))
+              for _, low, high in PRICE_BUCKETS),
+        )
+        .where(*_menu_item_filters(
+            category, vegetarian, vegan,
+            min_price, max_price, min_prep_time, max_prep_time
+        ))
+        .group_by(MenuItem.category)
+    )
+    result = await db.execute(stmt)
+
+    facets = {
+        "total": 0,
+        "category": {},
+        "vegetarian": 0,
+        "vegan": 0,
+        "available": 0,
+        "price": {label: 0 for label, _, _ in PRICE_BUCKETS},
+    }
+    for name, total, veg, vegan_count, available, *buckets in result:
+        facets["total"] += total
+        facets["category"][name] = total
+        facets["vegetarian"] += veg
+        facets["vegan"] += vegan_count
+        facets["available"] += available
+        for (label, _, _), count in zip(PRICE_BUCKETS, buckets):
+            facets["price"][label] += count
+    return facets
+
+# ─────────── Versions (for ETag / Last-Modified) ───────────
+#
+# Cheap column-only queries: a conditional GET that ends in 304 never
+# loads or serializes the full rows. count(*) and max(updated_at) run as
+# separate scalar subqueries: alone, SQLite answers each from an index
+# (a b-tree count, one seek), together it would walk every entry.
+
+def _count_and_latest(model, *where):
+    return select(
+        select(func.count()).select_from(model).where(*where).scalar_subquery(),
+        select(func.max(model.updated_at)).where(*where).scalar_subquery(),
+    )
+
+async def get_restaurant_version(
+    db: AsyncSession,
+    restaurant_id: int
+) -> Optional[datetime]:
+    result = await db.execute(
+        select(Restaurant.updated_at).where(Restaurant.id == restaurant_id)
+    )
+    return result.scalar_one_or_none()
+
+async def get_restaurants_version(
+    db: AsyncSession
+) -> Tuple[int, Optional[datetime]]:
+    result = await db.execute(_count_and_latest(Restaurant))
+    return tuple(result.one())
+
+async def get_menu_item_version(
+    db: AsyncSession,
+    item_id: int
+) -> Optional[datetime]:
+    result = await db.execute(
+        select(MenuItem.updated_at).where(MenuItem.id == item_id)
+    )
+    return result.scalar_one_or_none()
+
+async def get_menu_items_version(
+    db: AsyncSession,
+    restaurant_id: Optional[int] = None
+) -> Tuple[int, Optional[datetime]]:
+    where = [] if restaurant_id is None else [MenuItem.restaurant_id == restaurant_id]
+    result = await db.execute(_count_and_latest(MenuItem, *where))
+    return tuple(result.one())
+
+async def get_restaurant_with_menu_version(
+    db: AsyncSession,
+    restaurant_id: int
+) -> Optional[Tuple[datetime, int, Optional[datetime]]]:
+    # restaurant.updated_at plus count/max(updated_at) of its menu, one query
+    menu = select(MenuItem).where(MenuItem.restaurant_id == restaurant_id)
+    result = await db.execute(
+        select(
+            Restaurant.updated_at,
+            menu.with_only_columns(func.count()).scalar_subquery(),
+            menu.with_only_columns(func.max(MenuItem.updated_at)).scalar_subquery(),
+        ).where(Restaurant.id == restaurant_id)
+    )
+    row = result.one_or_none()
+    return tuple(row) if row else None
@@ -1,29 +1,65 @@
 # database.py
 import os
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
+from instrumentation import instrument
+
 # 1. Database URL (SQLite file in current dir)
 DATABASE_URL = "sqlite+aiosqlite:///./restaurants.db"
 
-# 2. Create async engine
+# 2. Engine settings (override through the environment, e.g. SQL_ECHO=true)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",     # readers no longer wait behind the writer
+    "synchronous": "NORMAL",   # fsync at checkpoints only; safe with WAL
+    "mmap_size": 268435456,    # read pages through a 256 MB memory map
+    "cache_size": -64000,      # 64 MB page cache per connection
+    "busy_timeout": 5000,      # wait up to 5s for a lock instead of failing
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",      # ON DELETE CASCADE removes a restaurant's menu items
+}
+
+# 3. Create async engine
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,       # show SQL in console
-    future=True      # use SQLAlchemy 2.0 style
+    echo=SQL_ECHO,   # show SQL in console
+    future=True,     # use SQLAlchemy 2.0 style
+    # aiosqlite defaults to NullPool, which opens a new connection per session
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
 )
 
-# 3. Session factory
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+# Per-request query counts, Server-Timing, slow-query and N+1 logging
+instrument(engine)
+
+# 4. Session factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
-# 4. Base class for our models
+# 5. Base class for our models
 Base = declarative_base()
 
-# 5. Dependency for FastAPI endpoints
+# 6. Dependency for FastAPI endpoints
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
@@ -34,7 +70,19 @@ async def get_db():
         finally:
             await session.close()
 
-# 6. Helper to create all tables
+def create_missing_indexes(sync_conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+# 7. Helper to create all tables (and the full-text / opening-hours indexes)
 async def create_tables():
+    from hours_index import create_hours_index
+    from search_index import create_search_index
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that exist; add indexes introduced since
+        await conn.run_sync(create_missing_indexes)
+        await create_search_index(conn)
+        await create_hours_index(conn)
@@ -0,0 +1,104 @@
+# hours_index.py
+#
+# Opening-hours index for "open at HH:MM" queries. Each restaurant's hours
+# become minute-of-day intervals [start, end); overnight hours (18:00-02:00)
+# wrap past midnight and become two, [1080, 1440) and [0, 120). Every
+# interval is listed under each clock hour it overlaps, keyed by
+# (hour, restaurant_id), so the restaurants open at a minute are one
+# primary-key range already in id order: O(log n + k), and a page of them
+# reads only that page. Triggers keep the table in sync with `restaurants`,
+# like the full-text index in search_index.py.
+
+import json
+from datetime import time
+
+from sqlalchemy import column, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+MINUTES_PER_DAY = 24 * 60
+HOURS = json.dumps(list(range(24)))
+
+# Lightweight table clause for use in crud queries
+restaurant_open_hours = table(
+    "restaurant_open_hours",
+    column("hour"),
+    column("restaurant_id"),
+    column("start_minute"),
+    column("end_minute"),
+)
+
+
+def _minute_sql(value: str) -> str:
+    # SQLite stores Time columns as 'HH:MM:SS.ffffff'
+    return (
+        f"(CAST(substr({value}, 1, 2) AS INTEGER) * 60"
+        f" + CAST(substr({value}, 4, 2) AS INTEGER))"
+    )
+
+
+def _insert_sql(source: str) -> str:
+    """INSERT the index rows for every restaurant row in `source`.
+
+    `source` is a SELECT yielding (id, opening_time, closing_time). Equal
+    opening and closing times mean open all day.
+    """
+    minutes = (
+        f"(SELECT id, {_minute_sql('opening_time')} AS o, "
+        f"{_minute_sql('closing_time')} AS c FROM ({source}))"
+    )
+    intervals = (
+        "SELECT id, CASE WHEN o = c THEN 0 ELSE o END AS s, "
+        f"CASE WHEN o < c THEN c ELSE {MINUTES_PER_DAY} END AS e FROM {minutes} "
+        f"UNION ALL SELECT id, 0, c FROM {minutes} WHERE o > c AND c > 0"
+    )
+    return (
+        "INSERT INTO restaurant_open_hours "
+        "(hour, restaurant_id, start_minute, end_minute) "
+        f"SELECT h.value, i.id, i.s, i.e FROM ({intervals}) AS i "
+        f"JOIN json_each('{HOURS}') AS h "
+        "ON h.value * 60 < i.e AND h.value * 60 + 60 > i.s;"
+    )
+
+
+def _ddl():
+    insert_new = _insert_sql(
+        "SELECT new.id AS id, new.opening_time AS opening_time, "
+        "new.closing_time AS closing_time"
+    )
+    # one primary-key seek per hour rather than a scan for restaurant_id
+    hours = ", ".join(str(hour) for hour in range(24))
+    delete_old = (
+        f"DELETE FROM restaurant_open_hours "
+        f"WHERE hour IN ({hours}) AND restaurant_id = old.id;"
+    )
+    return [
+        "CREATE TABLE IF NOT EXISTS restaurant_open_hours ("
+        "hour INTEGER NOT NULL, restaurant_id INTEGER NOT NULL, "
+        "start_minute INTEGER NOT NULL, end_minute INTEGER NOT NULL, "
+        "PRIMARY KEY (hour, restaurant_id, start_minute)) WITHOUT ROWID",
+        "CREATE TRIGGER IF NOT EXISTS restaurant_open_hours_ai "
+        f"AFTER INSERT ON restaurants BEGIN {insert_new} END",
+        "CREATE TRIGGER IF NOT EXISTS restaurant_open_hours_ad "
+        f"AFTER DELETE ON restaurants BEGIN {delete_old} END",
+        "CREATE TRIGGER IF NOT EXISTS restaurant_open_hours_au "
+        "AFTER UPDATE OF opening_time, closing_time ON restaurants "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+async def create_hours_index(conn: AsyncConnection) -> None:
+    """Create the index table and triggers; index existing rows the first time."""
+    exists = (await conn.execute(
+        text("SELECT 1 FROM sqlite_master "
+             "WHERE type = 'table' AND name = 'restaurant_open_hours'")
+    )).first()
+    for statement in _ddl():
+        await conn.execute(text(statement))
+    if not exists:
+        await conn.execute(text(_insert_sql(
+            "SELECT id, opening_time, closing_time FROM restaurants"
+        )))
+
+
+def minute_of_day(at: time) -> int:
+    return at.hour * 60 + at.minute
@@ -0,0 +1,143 @@
+# instrumentation.py
+#
+# Per-request SQL statistics from SQLAlchemy engine events, in place of
+# echo=True: query count, DB time and rows for every request (sent back as a
+# Server-Timing header), sampled slow-query logs with their query plan, and a
+# warning when one request repeats the same statement (an N+1 pattern).
+# Statements that repeat by design, one per chunk of a batch, opt out with
+# `.execution_options(batch=True)`.
+
+import logging
+import os
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Tunable through the environment, e.g. SLOW_QUERY_MS=50
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+
+class RequestStats:
+    """SQL issued while serving one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+        # SELECTs only: same SQL text with different parameters is a repeat
+        # (chunked bulk INSERTs repeat by design)
+        self.statements: Counter = Counter()
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.statements.items()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};'
+            f'desc="{self.queries} queries, {self.rows} rows"'
+        )
+
+
+# Engine events run in SQLAlchemy's greenlet, which shares the request's context
+_current: ContextVar[Optional[RequestStats]] = ContextVar("sql_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        # SELECT/RETURNING rows are already buffered by the aiosqlite adapter
+        rows = cursor.rowcount
+        stats.rows += rows if rows >= 0 else len(getattr(cursor, "_rows", ()))
+        if _is_select(statement) and not _is_batch(context):
+            stats.statements[statement] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS and random.random() < SLOW_QUERY_SAMPLE_RATE:
+        plan = None if executemany else _query_plan(conn, statement, parameters)
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f}ms): {' '.join(statement.split())} {parameters}"
+            + (f"\n  plan: {' | '.join(plan)}" if plan else "")
+        )
+
+
+def _is_select(statement: str) -> bool:
+    return statement.lstrip()[:6].upper() == "SELECT"
+
+
+def _is_batch(context) -> bool:
+    return context is not None and context.execution_options.get("batch", False)
+
+
+def _query_plan(conn, statement, parameters) -> Optional[List[str]]:
+    if not _is_select(statement):
+        return None
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+
+def instrument(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLStatsMiddleware:
+    """ASGI middleware that collects `RequestStats` for each HTTP request.
+
+    Plain ASGI rather than `@app.middleware("http")`, which costs an extra
+    task and response copy per request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+        # checked after the body is sent, so streamed responses count too
+        for statement, count in stats.repeated():
+            logger.warning(
+                f"Possible N+1 in {scope['method']} {scope['path']}: "
+                f"{count}x {' '.join(statement.split())}"
+            )
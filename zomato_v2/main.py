@@ -1,9 +1,13 @@
 from fastapi import FastAPI
 import uvicorn
 
-from database import create_tables
+from catalog import CATALOG_SNAPSHOT, snapshot
+from database import create_tables, engine
+from instrumentation import SQLStatsMiddleware
 from routes.restaurants import router as restaurants_router
 from routes.menu_items import router as menu_items_router
+from routes.search import router as search_router
+from routes.export import router as export_router
 
 app = FastAPI(
     title="Zomato v2: Restaurant & Menu Management",
@@ -14,9 +18,22 @@ app = FastAPI(
 @app.on_event("startup")
 async def on_startup():
     await create_tables()
+    if CATALOG_SNAPSHOT:
+        await snapshot.start()
+
+# Close pooled connections so their worker threads let the process exit
+@app.on_event("shutdown")
+async def on_shutdown():
+    await snapshot.stop()
+    await engine.dispose()
+
+# Server-Timing header plus slow-query / N+1 logging for every request
+app.add_middleware(SQLStatsMiddleware)
 
 app.include_router(restaurants_router)
 app.include_router(menu_items_router)
+app.include_router(search_router)
+app.include_router(export_router)
 
 @app.get("/", tags=["root"])
 async def read_root():
@@ -9,11 +9,22 @@ from sqlalchemy import (
     Text,
     ForeignKey,
     Numeric,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
+
+def utc_now():
+    """UTC now with milliseconds, as SQLite stores DateTime columns.
+
+    CURRENT_TIMESTAMP (func.now()) stops at whole seconds, so a second
+    write within the same second would leave updated_at, and every ETag
+    built on it, unchanged. Last-Modified still rounds down to the second.
+    """
+    return func.strftime("%Y-%m-%d %H:%M:%f", "now")
+
 class Restaurant(Base):
     __tablename__ = "restaurants"
 
@@ -23,23 +34,34 @@ class Restaurant(Base):
     cuisine_type = Column(String(50), nullable=False, index=True)
     address = Column(String(200), nullable=False)
     phone_number = Column(String(20), nullable=False, unique=True)
-    rating = Column(Float, default=0.0)
+    rating = Column(Float, default=0.0, index=True)
     is_active = Column(Boolean, default=True)
     opening_time = Column(Time, nullable=False)
     closing_time = Column(Time, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=utc_now())
     updated_at = Column(
         DateTime(timezone=True),
-        server_default=func.now(),
-        onupdate=func.now()
+        server_default=utc_now(),
+        onupdate=utc_now()
     )
 
     # <-- NEW: one-to-many relationship to menu_items
+    # Never loaded implicitly: crud functions that need it ask for it with
+    # a loader option, and any other access raises instead of querying.
+    # Deletes rely on the ON DELETE CASCADE foreign key.
     menu_items = relationship(
         "MenuItem",
         back_populates="restaurant",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        passive_deletes=True,
+        lazy="raise"
+    )
+
+    __table_args__ = (
+        # max(updated_at) for the list ETag is an index lookup
+        Index("ix_restaurants_updated_at", "updated_at"),
+        # /active pages and cursor seeks read only active rows
+        Index("ix_restaurants_active_id", "id", sqlite_where=is_active == True),
     )
 
 class MenuItem(Base):
@@ -63,16 +85,31 @@ class MenuItem(Base):
         index=True
     )
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=utc_now())
     updated_at = Column(
         DateTime(timezone=True),
-        server_default=func.now(),
-        onupdate=func.now()
+        server_default=utc_now(),
+        onupdate=utc_now()
     )
 
-    # <-- NEW: relationship back to Restaurant
+    # <-- NEW: relationship back to Restaurant (loaded on request only)
     restaurant = relationship(
         "Restaurant",
         back_populates="menu_items",
-        lazy="selectin"
+        lazy="raise"
+    )
+
+    __table_args__ = (
+        Index("ix_menu_items_updated_at", "updated_at"),
+        # count + max(updated_at) of one menu (ETags) without touching rows
+        Index("ix_menu_items_restaurant_updated", "restaurant_id", "updated_at"),
+        # dietary filters: seek straight to flagged rows, already in id order
+        Index("ix_menu_items_vegetarian_id", "id", sqlite_where=is_vegetarian == True),
+        Index("ix_menu_items_vegan_id", "id", sqlite_where=is_vegan == True),
+        # facet counts: GROUP BY category over this index, never the table
+        Index(
+            "ix_menu_items_facets",
+            "category", "is_vegetarian", "is_vegan", "is_available",
+            "price", "preparation_time"
+        ),
     )
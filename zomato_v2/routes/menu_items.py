@@ -1,44 +1,117 @@
 # routes/menu_items.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
+from decimal import Decimal
 from typing import List, Optional
 
+from catalog import get_reader
 from database import get_db
 from schemas import (
     MenuItemCreate,
     MenuItemUpdate,
     MenuItemResponse,
-    MenuItemWithRestaurant
+    MenuItemWithRestaurant,
+    FacetedMenuSearch
 )
 import crud
+from conditional import make_etag, is_not_modified, not_modified, validators
+from models import MenuItem
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from serialization import FAST_RESPONSES, fast_list, json_response, trusted_rows
 
 router = APIRouter(prefix="/menu-items", tags=["menu-items"])
 
+def _set_next_cursor(response: Response, items, limit: int) -> None:
+    cursor = next_cursor(items, limit, (MenuItem.id,))
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
 @router.get(
     "/",
     response_model=List[MenuItemResponse]
 )
 async def read_all_menu_items(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
 ):
-    return await crud.get_all_menu_items(db, skip, limit)
+    # `cursor` (from the previous page's X-Next-Cursor) replaces `skip`
+    after = decode_cursor(cursor, 1)
+    count, last_updated = await reads.get_menu_items_version(db)
+    etag = make_etag("menu-items", skip, limit, cursor, count, last_updated)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers.update(validators(etag))
+    items = await reads.get_all_menu_items(db, skip, limit, after)
+    _set_next_cursor(response, items, limit)
+    return fast_list(items, MenuItemResponse, response)
 
 @router.get(
     "/search",
     response_model=List[MenuItemResponse]
 )
 async def search_menu_items(
+    response: Response,
+    category: Optional[str] = None,
+    vegetarian: Optional[bool] = None,
+    vegan: Optional[bool] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    min_prep_time: Optional[int] = None,
+    max_prep_time: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
+):
+    items = await reads.search_menu_items(
+        db, category, vegetarian, vegan, skip, limit, decode_cursor(cursor, 1),
+        min_price=min_price, max_price=max_price,
+        min_prep_time=min_prep_time, max_prep_time=max_prep_time
+    )
+    _set_next_cursor(response, items, limit)
+    return fast_list(items, MenuItemResponse, response)
+
+@router.get(
+    "/search/faceted",
+    response_model=FacetedMenuSearch
+)
+async def search_menu_items_faceted(
+    response: Response,
     category: Optional[str] = None,
     vegetarian: Optional[bool] = None,
     vegan: Optional[bool] = None,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    min_prep_time: Optional[int] = None,
+    max_prep_time: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    return await crud.search_menu_items(db, category, vegetarian, vegan, skip, limit)
+    # Same filters as /search; the page plus all facet counts in two queries
+    filters = dict(
+        category=category, vegetarian=vegetarian, vegan=vegan,
+        min_price=min_price, max_price=max_price,
+        min_prep_time=min_prep_time, max_prep_time=max_prep_time
+    )
+    items = await crud.search_menu_items(
+        db, skip=skip, limit=limit, after=decode_cursor(cursor, 1), **filters
+    )
+    _set_next_cursor(response, items, limit)
+    facets = await crud.get_menu_item_facets(db, **filters)
+    result = {"total": facets.pop("total"), "items": items, "facets": facets}
+    if FAST_RESPONSES:
+        result["items"] = trusted_rows(items, MenuItemResponse)
+        return json_response(result, response)
+    return result
 
 @router.get(
     "/{item_id}",
@@ -46,11 +119,21 @@ async def search_menu_items(
 )
 async def read_menu_item(
     item_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
 ):
-    item = await crud.get_menu_item(db, item_id)
+    updated_at = await reads.get_menu_item_version(db, item_id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+    etag = make_etag("menu-item", item_id, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
+    item = await reads.get_menu_item(db, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    response.headers.update(validators(etag, updated_at))
     return item
 
 @router.get(
@@ -59,9 +142,10 @@ async def read_menu_item(
 )
 async def read_menu_item_with_restaurant(
     item_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
 ):
-    item = await crud.get_menu_item(db, item_id)
+    item = await reads.get_menu_item_with_restaurant(db, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Menu item not found")
     return item
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from datetime import datetime, time
+from typing import List, Literal, Optional
 
+from catalog import get_reader
 from database import get_db
 from schemas import (
     RestaurantCreate,
@@ -9,12 +11,28 @@ from schemas import (
     RestaurantResponse,
     RestaurantWithMenu,
     MenuItemCreate,
-    MenuItemResponse
+    MenuItemResponse,
+    BulkResult,
+    BulkRowResult
 )
 import crud
+from hours_index import minute_of_day
+from models import Restaurant
+from conditional import make_etag, is_not_modified, not_modified, validators
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from serialization import fast_list
 
 router = APIRouter(prefix="/restaurants", tags=["restaurants"])
 
+BULK_MAX_ROWS = 10_000
+
+def _check_batch_size(rows: list) -> None:
+    if not 1 <= len(rows) <= BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Send between 1 and {BULK_MAX_ROWS} rows."
+        )
+
 @router.post(
     "/",
     response_model=RestaurantResponse,
@@ -26,16 +44,88 @@ async def create_restaurant(
 ):
     return await crud.create_restaurant(db, payload)
 
+# Both bulk routes answer 200: the body reports each row as created or
+# updated, and restaurant batches can mix the two
+@router.post(
+    "/bulk",
+    response_model=BulkResult
+)
+async def bulk_upsert_restaurants(
+    payload: List[RestaurantCreate],
+    db: AsyncSession = Depends(get_db)
+):
+    # Rows are matched to existing restaurants by phone number
+    _check_batch_size(payload)
+    first_seen = {}
+    duplicates = []
+    for index, restaurant in enumerate(payload):
+        if restaurant.phone_number in first_seen:
+            duplicates.append(index)
+        first_seen.setdefault(restaurant.phone_number, index)
+    if duplicates:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"message": "Duplicate phone_number in batch", "rows": duplicates}
+        )
+
+    outcomes = await crud.bulk_upsert_restaurants(db, payload)
+    results = [
+        BulkRowResult(index=index, id=id, status="created" if created else "updated")
+        for index, (id, created) in enumerate(outcomes)
+    ]
+    created = sum(1 for r in results if r.status == "created")
+    return BulkResult(created=created, updated=len(results) - created, results=results)
+
 @router.get(
     "/",
     response_model=List[RestaurantResponse]
 )
 async def read_restaurants(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: Literal["id", "rating"] = "id",
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
+):
+    # `cursor` (from the previous page's X-Next-Cursor) replaces `skip`
+    columns, _ = crud.RESTAURANT_SORTS[sort]
+    after = decode_cursor(cursor, len(columns))
+    count, last_updated = await reads.get_restaurants_version(db)
+    etag = make_etag("restaurants", skip, limit, cursor, sort, count, last_updated)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers.update(validators(etag))
+    restaurants = await reads.get_restaurants(db, skip, limit, after, sort)
+    cursor = next_cursor(restaurants, limit, columns)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return fast_list(restaurants, RestaurantResponse, response)
+
+@router.get(
+    "/open",
+    response_model=List[RestaurantResponse]
+)
+async def read_open_restaurants(
+    response: Response,
+    at: Optional[time] = None,
+    cuisine: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    return await crud.get_restaurants(db, skip, limit)
+    # `at` is HH:MM in the restaurants' local time; defaults to now
+    minute = minute_of_day(at or datetime.now().time())
+    restaurants = await crud.get_open_restaurants(
+        db, minute, cuisine, skip, limit, decode_cursor(cursor, 1)
+    )
+    cursor = next_cursor(restaurants, limit, (Restaurant.id,))
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return fast_list(restaurants, RestaurantResponse, response)
 
 @router.get(
     "/{restaurant_id}",
@@ -43,11 +133,21 @@ async def read_restaurants(
 )
 async def read_restaurant(
     restaurant_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
 ):
-    restaurant = await crud.get_restaurant(db, restaurant_id)
+    updated_at = await reads.get_restaurant_version(db, restaurant_id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    etag = make_etag("restaurant", restaurant_id, updated_at)
+    if is_not_modified(request, etag, updated_at):
+        return not_modified(etag, updated_at)
+    restaurant = await reads.get_restaurant(db, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    response.headers.update(validators(etag, updated_at))
     return restaurant
 
 @router.put(
@@ -94,17 +194,48 @@ async def create_menu_item_for_restaurant(
         raise HTTPException(status_code=404, detail="Parent restaurant not found")
     return item
 
+@router.post(
+    "/{restaurant_id}/menu-items/bulk",
+    response_model=BulkResult
+)
+async def bulk_create_menu_items_for_restaurant(
+    restaurant_id: int,
+    payload: List[MenuItemCreate],
+    db: AsyncSession = Depends(get_db)
+):
+    _check_batch_size(payload)
+    ids = await crud.bulk_create_menu_items(db, restaurant_id, payload)
+    if ids is None:
+        raise HTTPException(status_code=404, detail="Parent restaurant not found")
+    return BulkResult(
+        created=len(ids),
+        updated=0,
+        results=[
+            BulkRowResult(index=index, id=id, status="created")
+            for index, id in enumerate(ids)
+        ]
+    )
+
 @router.get(
     "/{restaurant_id}/menu",
     response_model=List[MenuItemResponse]
 )
 async def read_menu_for_restaurant(
     restaurant_id: int,
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
 ):
-    return await crud.get_menu_for_restaurant(db, restaurant_id)
+    count, last_updated = await reads.get_menu_items_version(db, restaurant_id)
+    etag = make_etag("menu", restaurant_id, count, last_updated)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers.update(validators(etag))
+    items = await reads.get_menu_for_restaurant(db, restaurant_id)
+    return fast_list(items, MenuItemResponse, response)
 
 @router.get(
     "/{restaurant_id}/with-menu",
@@ -112,9 +243,19 @@ async def read_menu_for_restaurant(
 )
 async def read_restaurant_with_menu(
     restaurant_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    reads=Depends(get_reader)
 ):
-    restaurant = await crud.get_restaurant_with_menu(db, restaurant_id)
+    version = await reads.get_restaurant_with_menu_version(db, restaurant_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    etag = make_etag("restaurant-with-menu", restaurant_id, *version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    restaurant = await reads.get_restaurant_with_menu(db, restaurant_id)
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    response.headers.update(validators(etag))
     return restaurant
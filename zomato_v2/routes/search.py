@@ -0,0 +1,25 @@
+# routes/search.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from schemas import SearchResults
+import crud
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get(
+    "",
+    response_model=SearchResults
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    # Prefix match on every word, e.g. "pan tik" finds "Paneer Tikka"
+    return SearchResults(
+        restaurants=await crud.search_restaurants(db, q, limit),
+        menu_items=await crud.search_menu_items_text(db, q, limit)
+    )
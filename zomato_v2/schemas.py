@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 from datetime import datetime, time
 from decimal import Decimal
 
@@ -110,3 +110,33 @@ class MenuItemWithRestaurant(MenuItemResponse):
 
     class Config:
         from_attributes = True
+
+class BulkRowResult(BaseModel):
+    """Outcome for one row of a bulk request, in request order."""
+    index: int
+    id: int
+    status: Literal["created", "updated"]
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    results: List[BulkRowResult]
+
+class SearchResults(BaseModel):
+    """Full-text search hits, best match first."""
+    restaurants: List[RestaurantResponse]
+    menu_items: List[MenuItemResponse]
+
+class MenuFacets(BaseModel):
+    """Match counts for every facet of a menu search."""
+    category: Dict[str, int]
+    vegetarian: int
+    vegan: int
+    available: int
+    price: Dict[str, int]
+
+class FacetedMenuSearch(BaseModel):
+    """One page of menu search results plus facet counts over all matches."""
+    total: int
+    items: List[MenuItemResponse]
+    facets: MenuFacets
@@ -0,0 +1,67 @@
+# search_index.py
+#
+# SQLite FTS5 full-text index over restaurants and menu items. The FTS tables
+# are "external content" tables: they store only the index and read the text
+# back from `restaurants` / `menu_items`, and triggers keep them in sync on
+# every INSERT, UPDATE and DELETE.
+
+import re
+from typing import Dict, Tuple
+
+from sqlalchemy import column, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# FTS table -> (content table, indexed columns)
+FTS_TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "restaurants_fts": ("restaurants", ("name", "description", "cuisine_type")),
+    "menu_items_fts": ("menu_items", ("name", "description", "category")),
+}
+
+# Lightweight table clauses for use in crud queries
+restaurants_fts = table("restaurants_fts", column("rowid"))
+menu_items_fts = table("menu_items_fts", column("rowid"))
+
+
+def _ddl(fts: str, content: str, columns: Tuple[str, ...]):
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{content}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {content} BEGIN "
+        f"{insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {content} BEGIN "
+        f"{delete_old} END",
+        # only re-index when an indexed column changes, not on rating updates
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {content} BEGIN "
+        f"{delete_old} {insert_new} END",
+    ]
+
+
+async def create_search_index(conn: AsyncConnection) -> None:
+    """Create the FTS tables and triggers; index existing rows the first time."""
+    for fts, (content, columns) in FTS_TABLES.items():
+        exists = (await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": fts}
+        )).first()
+        for statement in _ddl(fts, content, columns):
+            await conn.execute(text(statement))
+        if not exists:
+            await conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def match_query(q: str) -> str:
+    """Turn free text into an FTS5 query: every word must match as a prefix.
+
+    Words are quoted so user input can never be parsed as FTS5 syntax.
+    Returns "" when `q` holds no searchable words.
+    """
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{word}"*' for word in words)
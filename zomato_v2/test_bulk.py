@@ -0,0 +1,94 @@
+# test_bulk.py
+
+import sqlite3
+
+from sqlalchemy import event
+
+import crud
+from conftest import WORKDIR, menu_item_payload, restaurant_payload
+from database import engine
+
+
+def test_bulk_restaurants_report_created_and_updated_rows(client, restaurant):
+    rows = [restaurant_payload(0, rating=3.0), restaurant_payload(1)]
+    response = client.post("/restaurants/bulk", json=rows)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"]) == (1, 1)
+    assert [r["status"] for r in body["results"]] == ["updated", "created"]
+
+
+def test_bulk_menu_items_use_the_same_status(client, restaurant):
+    rows = [menu_item_payload(n) for n in range(3)]
+    response = client.post(f"/restaurants/{restaurant['id']}/menu-items/bulk", json=rows)
+
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+
+
+def test_bulk_restaurants_keep_input_order_across_chunks(client, restaurant, monkeypatch):
+    monkeypatch.setattr(crud, "BULK_CHUNK_SIZE", 2)
+    client.post("/restaurants/", json=restaurant_payload(3))
+    # existing phones (0 and 3) land in different chunks, out of id order
+    rows = [restaurant_payload(n) for n in (4, 3, 5, 0, 6)]
+
+    body = client.post("/restaurants/bulk", json=rows).json()
+
+    assert (body["created"], body["updated"]) == (3, 2)
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3, 4]
+    assert [r["status"] for r in body["results"]] == [
+        "created", "updated", "created", "updated", "created"
+    ]
+    assert [r["id"] for r in body["results"]][1::2] == [2, 1]
+    assert [r["id"] for r in client.get("/restaurants/?limit=10").json()] == [1, 2, 3, 4, 5]
+
+
+def test_bulk_upsert_updates_the_existing_row(client, restaurant):
+    client.post("/restaurants/bulk", json=[restaurant_payload(0, name="Renamed", rating=2.5)])
+
+    updated = client.get(f"/restaurants/{restaurant['id']}").json()
+    assert (updated["name"], updated["rating"]) == ("Renamed", 2.5)
+    assert updated["created_at"] == restaurant["created_at"]
+
+
+def test_duplicate_phone_numbers_in_a_batch_are_rejected(client):
+    rows = [restaurant_payload(0), restaurant_payload(1), restaurant_payload(0)]
+    response = client.post("/restaurants/bulk", json=rows)
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["rows"] == [2]
+    assert client.get("/restaurants/").json() == []
+
+
+def test_concurrent_insert_cannot_slip_between_lookup_and_upsert(client):
+    blocked = []
+
+    def insert_after_lookup(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT restaurants.phone_number") and not blocked:
+            # a second writer, inserting a phone from the batch; no busy wait
+            other = sqlite3.connect(WORKDIR / "restaurants.db", timeout=0)
+            try:
+                with other:
+                    other.execute(
+                        "INSERT INTO restaurants (name, cuisine_type, address, phone_number, "
+                        "rating, is_active, opening_time, closing_time) "
+                        "VALUES ('Other', 'Thai', '9 Side Street', ?, 4, 1, "
+                        "'09:00:00.000000', '22:00:00.000000')",
+                        (restaurant_payload(1)["phone_number"],)
+                    )
+                blocked.append(False)
+            except sqlite3.OperationalError as exc:
+                blocked.append("locked" in str(exc))
+            finally:
+                other.close()
+
+    event.listen(engine.sync_engine, "after_cursor_execute", insert_after_lookup)
+    try:
+        body = client.post("/restaurants/bulk", json=[restaurant_payload(1)]).json()
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", insert_after_lookup)
+
+    # the lookup already holds the write lock, so "created" stays true
+    assert blocked == [True]
+    assert body["results"][0]["status"] == "created"
@@ -0,0 +1,116 @@
+# test_catalog.py
+
+import sqlite3
+
+import pytest
+from sqlalchemy import event, text
+
+import catalog
+from catalog import CatalogSnapshot, _change_log_ddl
+from conftest import WORKDIR, menu_item_payload, restaurant_payload
+from database import engine
+from pagination import encode_cursor
+
+
+def insert_restaurant_with_menu_item():
+    # a second writer, committing between the snapshot's SELECTs
+    conn = sqlite3.connect(WORKDIR / "restaurants.db")
+    with conn:
+        restaurant_id = conn.execute(
+            "INSERT INTO restaurants (name, cuisine_type, address, phone_number, "
+            "rating, is_active, opening_time, closing_time) "
+            "VALUES ('Late', 'Thai', '9 Side Street', '+15559999999', 4, 1, "
+            "'09:00:00.000000', '22:00:00.000000')"
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO menu_items (name, price, category, is_vegetarian, is_vegan, "
+            "is_available, preparation_time, restaurant_id) "
+            "VALUES ('Curry', 9.5, 'Main', 0, 0, 1, 10, ?)", (restaurant_id,)
+        )
+    conn.close()
+
+
+@pytest.fixture
+def write_after_restaurants_are_read():
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT restaurants.id") and not written:
+            written.append(True)
+            insert_restaurant_with_menu_item()
+
+    written = []
+    event.listen(engine.sync_engine, "after_cursor_execute", after_execute)
+    yield written
+    event.remove(engine.sync_engine, "after_cursor_execute", after_execute)
+
+
+def test_load_reads_one_consistent_snapshot(client, restaurant, write_after_restaurants_are_read):
+    catalog = CatalogSnapshot()
+
+    async def load():
+        async with engine.begin() as conn:
+            for statement in _change_log_ddl():
+                await conn.execute(text(statement))
+        await catalog.load()
+
+    client.portal.call(load)
+
+    assert write_after_restaurants_are_read == [True]
+    # the concurrent write is left for the next refresh, rows and all
+    assert len(catalog.restaurants) == 1
+    assert len(catalog.menu_items) == 2
+    for item_id in catalog.menu_items:
+        assert client.portal.call(catalog.get_menu_item_with_restaurant, None, item_id)
+
+
+@pytest.fixture
+def get_from_snapshot(client, monkeypatch):
+    """GET a url with the routes reading from a freshly loaded snapshot."""
+    def get(url):
+        fresh = CatalogSnapshot()
+        monkeypatch.setattr(catalog, "snapshot", fresh)
+        client.portal.call(fresh.start)
+        try:
+            return client.get(url)
+        finally:
+            client.portal.call(fresh.stop)
+    return get
+
+
+# paging inputs the routes accept; the snapshot must page like SQLite
+PAGES = [
+    "limit=-1",
+    "limit=0",
+    "skip=-1&limit=2",
+    "skip=1&limit=-1",
+    "skip=5",
+    f"cursor={encode_cursor('x')}",
+    f"cursor={encode_cursor(1)}&limit=-1",
+]
+
+
+@pytest.mark.parametrize("route", ["/restaurants/", "/menu-items/", "/menu-items/search"])
+@pytest.mark.parametrize("query", PAGES)
+def test_snapshot_pages_like_sql(client, get_from_snapshot, route, query):
+    client.post("/restaurants/bulk", json=[restaurant_payload(n) for n in range(3)])
+    client.post("/restaurants/1/menu-items/bulk", json=[menu_item_payload(n) for n in range(3)])
+    url = f"{route}?{query}"
+
+    from_sql = client.get(url)
+    from_snapshot = get_from_snapshot(url)
+
+    assert from_snapshot.status_code == from_sql.status_code
+    assert from_snapshot.json() == from_sql.json() or (
+        [row["id"] for row in from_snapshot.json()] == [row["id"] for row in from_sql.json()]
+    )
+
+
+@pytest.mark.parametrize("query", ["limit=-1", "skip=-1&limit=2", "skip=1&limit=-1"])
+def test_snapshot_pages_by_rating_like_sql(client, get_from_snapshot, query):
+    rows = [restaurant_payload(n, rating=n % 3) for n in range(5)]
+    client.post("/restaurants/bulk", json=rows)
+    url = f"/restaurants/?sort=rating&{query}"
+
+    from_sql = client.get(url)
+    from_snapshot = get_from_snapshot(url)
+
+    assert [row["id"] for row in from_snapshot.json()] == [row["id"] for row in from_sql.json()]
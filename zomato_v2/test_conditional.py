@@ -0,0 +1,53 @@
+# test_conditional.py
+#
+# A write must change the validators of every representation it touches,
+# even when it lands in the same second as the client's cached copy.
+
+import pytest
+
+ROUTES = [
+    "/restaurants/{id}",
+    "/restaurants/",
+    "/restaurants/{id}/with-menu",
+    "/restaurants/{id}/menu",
+    "/menu-items/",
+]
+
+
+@pytest.mark.parametrize("route", ROUTES)
+def test_update_changes_etag(client, restaurant, route):
+    url = route.format(id=restaurant["id"])
+    item = client.get(f"/restaurants/{restaurant['id']}/menu").json()[0]
+    etag = client.get(url).headers["etag"]
+
+    client.put(f"/restaurants/{restaurant['id']}", json={"rating": 4.5})
+    client.put(f"/menu-items/{item['id']}", json={"price": "10.00"})
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_menu_item_update_changes_etag(client, restaurant):
+    item = client.get(f"/restaurants/{restaurant['id']}/menu").json()[0]
+    url = f"/menu-items/{item['id']}"
+    etag = client.get(url).headers["etag"]
+
+    client.put(url, json={"price": "10.00"})
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["price"] == "10.00"
+
+
+def test_unchanged_resource_is_not_modified(client, restaurant):
+    url = f"/restaurants/{restaurant['id']}"
+    first = client.get(url)
+
+    response = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304
+    # HTTP dates have whole seconds
+    response = client.get(
+        url, headers={"If-Modified-Since": first.headers["last-modified"]}
+    )
+    assert response.status_code == 304
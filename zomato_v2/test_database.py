@@ -0,0 +1,41 @@
+# test_database.py
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from database import SQLITE_PRAGMAS, AsyncSessionLocal, engine
+
+# how SQLite reports each pragma back
+EXPECTED = {
+    "journal_mode": "wal",
+    "synchronous": 1,  # NORMAL
+    "mmap_size": SQLITE_PRAGMAS["mmap_size"],
+    "cache_size": SQLITE_PRAGMAS["cache_size"],
+    "busy_timeout": SQLITE_PRAGMAS["busy_timeout"],
+    "temp_store": 2,  # MEMORY
+    "foreign_keys": 1,
+}
+
+
+async def _pragmas():
+    async with AsyncSessionLocal() as db:
+        return {name: (await db.execute(text(f"PRAGMA {name}"))).scalar() for name in EXPECTED}
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_pragma_is_applied(client, name):
+    assert client.portal.call(_pragmas)[name] == EXPECTED[name]
+
+
+def test_sessions_reuse_pooled_connections(client):
+    async def connection_ids():
+        ids = []
+        for _ in range(3):
+            async with AsyncSessionLocal() as db:
+                connection = await db.connection()
+                ids.append(id((await connection.get_raw_connection()).driver_connection))
+        return ids
+
+    assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+    assert len(set(client.portal.call(connection_ids))) == 1
@@ -0,0 +1,45 @@
+# test_export.py
+
+import json
+
+import pytest
+
+from conftest import menu_item_payload, restaurant_payload
+from routes import export
+
+
+@pytest.fixture
+def catalog(client, monkeypatch):
+    """Five restaurants with n menu items each, exported two rows per chunk."""
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 2)
+    for n in range(5):
+        created = client.post("/restaurants/", json=restaurant_payload(n)).json()
+        client.post(
+            f"/restaurants/{created['id']}/menu-items/bulk",
+            json=[menu_item_payload(m) for m in range(n)]
+        )
+
+
+def test_export_streams_every_restaurant_with_its_menu(client, catalog):
+    response = client.get("/export/catalog.ndjson")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["id"] for r in lines] == [1, 2, 3, 4, 5]
+    assert [len(r["menu_items"]) for r in lines] == [0, 1, 2, 3, 4]
+    assert lines[1] == client.get("/restaurants/2/with-menu").json()
+
+
+def test_export_writes_one_chunk_per_partition(client, catalog):
+    async def chunks():
+        return [chunk async for chunk in export.catalog_lines()]
+
+    assert [chunk.count("\n") for chunk in client.portal.call(chunks)] == [2, 2, 1]
+
+
+def test_empty_catalog_exports_nothing(client):
+    response = client.get("/export/catalog.ndjson")
+
+    assert response.status_code == 200
+    assert response.text == ""
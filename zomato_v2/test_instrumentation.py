@@ -0,0 +1,49 @@
+# test_instrumentation.py
+
+import logging
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+import instrumentation
+from conftest import restaurant_payload
+
+
+@pytest.fixture
+def warnings_logged(caplog):
+    caplog.set_level(logging.WARNING, logger="instrumentation")
+    return lambda: [r.getMessage() for r in caplog.records if "N+1" in r.getMessage()]
+
+
+def test_chunked_bulk_upsert_is_not_n_plus_one(client, warnings_logged):
+    rows = [restaurant_payload(n) for n in range(3000)]
+    assert client.post("/restaurants/bulk", json=rows).status_code == 200
+    # second pass updates every row
+    assert client.post("/restaurants/bulk", json=rows).status_code == 200
+    assert warnings_logged() == []
+
+
+def test_chunked_export_is_not_n_plus_one(client, warnings_logged):
+    for start in range(0, 3010, 1000):
+        rows = [restaurant_payload(n) for n in range(start, min(start + 1000, 3010))]
+        client.post("/restaurants/bulk", json=rows)
+    response = client.get("/export/catalog.ndjson")
+    assert len(response.text.splitlines()) == 3010
+    assert warnings_logged() == []
+
+
+def test_repeated_select_is_still_reported():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", instrumentation._before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", instrumentation._after_cursor_execute)
+    stats = instrumentation.RequestStats()
+    token = instrumentation._current.set(stats)
+    try:
+        with engine.connect() as conn:
+            for n in range(instrumentation.N_PLUS_ONE_THRESHOLD):
+                conn.execute(text("SELECT :n"), {"n": n})
+                conn.execute(text("SELECT :n + 1").execution_options(batch=True), {"n": n})
+    finally:
+        instrumentation._current.reset(token)
+
+    assert stats.repeated() == [("SELECT ?", instrumentation.N_PLUS_ONE_THRESHOLD)]
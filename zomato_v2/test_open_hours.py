@@ -0,0 +1,94 @@
+# test_open_hours.py
+#
+# /restaurants/open against a brute-force check of every restaurant's
+# hours, including ranges that wrap past midnight.
+
+import pytest
+
+from conftest import restaurant_payload
+
+# (opening, closing, is_active)
+HOURS = [
+    ("09:00", "22:00", True),
+    ("18:00", "02:00", True),   # overnight
+    ("00:00", "00:00", True),   # equal times: open all day
+    ("23:00", "01:30", True),   # overnight, ends mid-hour
+    ("11:30", "14:15", True),
+    ("18:00", "02:00", False),  # inactive rows are never listed
+]
+TIMES = ["00:00", "01:29", "01:30", "02:00", "08:59", "09:00", "11:30",
+         "14:14", "14:15", "21:59", "22:00", "23:00", "23:59"]
+
+
+def _minute(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _is_open(opening: str, closing: str, at: str) -> bool:
+    start, end, minute = _minute(opening), _minute(closing), _minute(at)
+    if start == end:
+        return True
+    if start < end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+def _expected(client, at: str) -> list:
+    return [
+        r["id"] for r in client.get("/restaurants/?limit=100").json()
+        if r["is_active"] and _is_open(r["opening_time"][:5], r["closing_time"][:5], at)
+    ]
+
+
+def _open_at(client, at: str, **params) -> list:
+    response = client.get("/restaurants/open", params={"at": at, **params})
+    assert response.status_code == 200
+    return [r["id"] for r in response.json()]
+
+
+@pytest.fixture
+def restaurants(client):
+    for n, (opening, closing, active) in enumerate(HOURS):
+        client.post("/restaurants/", json=restaurant_payload(
+            n, opening_time=opening, closing_time=closing, is_active=active,
+            cuisine_type="Thai" if n % 2 else "Italian",
+        ))
+
+
+@pytest.mark.parametrize("at", TIMES)
+def test_open_matches_the_hours(client, restaurants, at):
+    assert _open_at(client, at) == _expected(client, at)
+
+
+def test_cuisine_filter(client, restaurants):
+    italian = [r["id"] for r in client.get("/restaurants/").json() if r["cuisine_type"] == "Italian"]
+
+    assert _open_at(client, "23:30", cuisine="ital") == [
+        id for id in _expected(client, "23:30") if id in italian
+    ]
+
+
+def test_index_follows_writes(client, restaurants):
+    client.put("/restaurants/1", json={"opening_time": "22:00", "closing_time": "03:00"})
+    client.delete("/restaurants/2")
+    client.post("/restaurants/bulk", json=[
+        restaurant_payload(4, opening_time="00:30", closing_time="23:45"),
+        restaurant_payload(9, opening_time="20:00", closing_time="00:15"),
+    ])
+
+    for at in TIMES:
+        assert _open_at(client, at) == _expected(client, at), at
+
+
+def test_cursor_pages_through_the_open_restaurants(client, restaurants):
+    seen, cursor = [], None
+    while True:
+        params = {"at": "00:30", "limit": 1, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/restaurants/open", params=params)
+        seen += [r["id"] for r in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == _expected(client, "00:30")
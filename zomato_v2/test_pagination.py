@@ -0,0 +1,44 @@
+# test_pagination.py
+
+import pytest
+
+from conftest import restaurant_payload
+from pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("url,cursor", [
+    ("/restaurants/", [[1]]),
+    ("/restaurants/", [{"a": 1}]),
+    ("/restaurants/", ["1"]),
+    ("/restaurants/", [1.5]),
+    ("/restaurants/", [True]),
+    ("/restaurants/?sort=rating", [[4.0], 1]),
+    ("/restaurants/?sort=rating", [4.0, "1"]),
+    ("/menu-items/", [{"a": 1}]),
+    ("/menu-items/search", [[1]]),
+    ("/restaurants/open?at=12:00", [[1]]),
+])
+def test_malformed_cursor_is_a_bad_request(client, url, cursor):
+    separator = "&" if "?" in url else "?"
+    response = client.get(f"{url}{separator}cursor={encode_cursor(*cursor)}")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor."}
+
+
+def test_issued_cursors_round_trip(client):
+    client.post("/restaurants/bulk", json=[restaurant_payload(n, rating=n % 2) for n in range(4)])
+    for url in ("/restaurants/?limit=1", "/restaurants/?sort=rating&limit=1"):
+        seen = []
+        response = client.get(url)
+        while "x-next-cursor" in response.headers:
+            seen += [row["id"] for row in response.json()]
+            response = client.get(f"{url}&cursor={response.headers['x-next-cursor']}")
+            assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        assert sorted(seen) == [1, 2, 3, 4]
+
+
+def test_decode_cursor_keeps_numbers():
+    assert decode_cursor(encode_cursor(4.5, 7), 2) == (4.5, 7)
+    assert decode_cursor(encode_cursor(None, 7), 2) == (None, 7)
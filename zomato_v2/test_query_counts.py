@@ -0,0 +1,80 @@
+# test_query_counts.py
+#
+# Exact number of SQL statements each endpoint runs. A relationship that
+# starts loading lazily, or a loop that queries once per row, changes
+# these numbers. Counted on the engine rather than read from Server-Timing,
+# which is sent before a streamed body runs its queries.
+
+import pytest
+from sqlalchemy import event
+
+from conftest import menu_item_payload, restaurant_payload
+from database import engine
+
+# (method, url, body, queries); restaurant 1 has menu items 1 and 2
+ENDPOINTS = [
+    # version query, then the page
+    ("GET", "/restaurants/", None, 2),
+    ("GET", "/restaurants/?sort=rating", None, 2),
+    ("GET", "/restaurants/open?at=12:00", None, 1),
+    ("GET", "/restaurants/1", None, 2),
+    ("GET", "/restaurants/1/menu", None, 2),
+    # version, restaurant, one selectinload for the whole menu
+    ("GET", "/restaurants/1/with-menu", None, 3),
+    ("GET", "/menu-items/", None, 2),
+    ("GET", "/menu-items/search?vegetarian=false", None, 1),
+    # page, then every facet count in one GROUP BY
+    ("GET", "/menu-items/search/faceted?category=main", None, 2),
+    ("GET", "/menu-items/1", None, 2),
+    # restaurant comes in through a JOIN
+    ("GET", "/menu-items/1/with-restaurant", None, 1),
+    ("GET", "/search?q=dish", None, 2),
+    ("GET", "/export/catalog.ndjson", None, 2),
+    ("POST", "/restaurants/", restaurant_payload(1), 2),
+    # BEGIN IMMEDIATE, existing phones, one INSERT ... ON CONFLICT
+    ("POST", "/restaurants/bulk", [restaurant_payload(0), restaurant_payload(1)], 3),
+    ("PUT", "/restaurants/1", {"rating": 4.5}, 1),
+    ("DELETE", "/restaurants/1", None, 1),
+    ("POST", "/restaurants/1/menu-items/", menu_item_payload(2), 3),
+    ("POST", "/restaurants/1/menu-items/bulk", [menu_item_payload(2), menu_item_payload(3)], 2),
+    ("PUT", "/menu-items/1", {"price": "10.00"}, 1),
+    ("DELETE", "/menu-items/1", None, 1),
+]
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+@pytest.mark.parametrize("method,url,body,queries", ENDPOINTS)
+def test_query_count(client, restaurant, statements, method, url, body, queries):
+    statements.clear()
+    response = client.request(method, url, json=body)
+    assert response.status_code < 300
+    assert len(statements) == queries
+
+
+@pytest.mark.parametrize("url,queries", [
+    ("/restaurants/1/with-menu", 3),
+    ("/export/catalog.ndjson", 2),
+])
+def test_query_count_does_not_grow_with_rows(client, restaurant, statements, url, queries):
+    for n in range(2, 5):
+        created = client.post("/restaurants/", json=restaurant_payload(n)).json()
+        client.post(
+            f"/restaurants/{created['id']}/menu-items/bulk",
+            json=[menu_item_payload(m) for m in range(10)]
+        )
+    client.post("/restaurants/1/menu-items/bulk", json=[menu_item_payload(m) for m in range(10)])
+
+    statements.clear()
+    assert client.get(url).status_code == 200
+    assert len(statements) == queries
@@ -0,0 +1,220 @@
+# test_query_plans.py
+#
+# EXPLAIN QUERY PLAN over every statement each crud.py function issues. A
+# scan of restaurants or menu_items, or a temp b-tree sort, fails unless
+# EXPECTED_SCANS lists it for that call along with why it is fine. A new
+# crud function fails test_every_crud_function_is_covered until it gets a
+# case here.
+
+import asyncio
+import inspect
+from datetime import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+import crud
+from conftest import WORKDIR
+from database import AsyncSessionLocal, create_tables, engine
+from schemas import MenuItemCreate, MenuItemUpdate, RestaurantCreate, RestaurantUpdate
+
+LARGE_TABLES = ("restaurants", "menu_items")
+
+
+def restaurant(n: int) -> RestaurantCreate:
+    return RestaurantCreate(
+        name=f"Restaurant {n}", cuisine_type="Italian", address=f"{n} Main Street",
+        phone_number=f"+1555{n:07d}", rating=4.0,
+        opening_time=time(9), closing_time=time(22),
+    )
+
+
+def menu_item(n: int) -> MenuItemCreate:
+    return MenuItemCreate(
+        name=f"Pasta {n}", price=Decimal("9.50"), category="Main",
+        preparation_time=15, is_vegetarian=n % 2 == 0,
+    )
+
+
+# (case id, crud function, kwargs); writes come last so reads see the seed data
+CASES = [
+    ("get_restaurant", "get_restaurant", dict(restaurant_id=1)),
+    ("get_restaurants-first-page", "get_restaurants", {}),
+    ("get_restaurants-cursor", "get_restaurants", dict(after=(1,))),
+    ("get_restaurants-rating-first-page", "get_restaurants", dict(sort="rating")),
+    ("get_restaurants-rating-cursor", "get_restaurants", dict(sort="rating", after=(4.0, 1))),
+    ("search_restaurants_by_cuisine-first-page", "search_restaurants_by_cuisine", dict(cuisine="ital")),
+    ("search_restaurants_by_cuisine-cursor", "search_restaurants_by_cuisine", dict(cuisine="ital", after=(1,))),
+    ("get_active_restaurants-first-page", "get_active_restaurants", {}),
+    ("get_active_restaurants-cursor", "get_active_restaurants", dict(after=(1,))),
+    ("get_open_restaurants", "get_open_restaurants", dict(minute=600)),
+    ("get_open_restaurants-cuisine", "get_open_restaurants", dict(minute=600, cuisine="ital")),
+    ("get_open_restaurants-cursor", "get_open_restaurants", dict(minute=600, after=(1,))),
+    ("get_menu_item", "get_menu_item", dict(item_id=1)),
+    ("get_menu_item_with_restaurant", "get_menu_item_with_restaurant", dict(item_id=1)),
+    ("get_all_menu_items-first-page", "get_all_menu_items", {}),
+    ("get_all_menu_items-cursor", "get_all_menu_items", dict(after=(1,))),
+    ("search_menu_items-vegetarian-first-page", "search_menu_items", dict(vegetarian=True)),
+    ("search_menu_items-vegan-cursor", "search_menu_items", dict(vegan=True, after=(1,))),
+    ("search_menu_items-category", "search_menu_items", dict(category="main")),
+    ("search_menu_items-price-range", "search_menu_items",
+     dict(min_price=Decimal(5), max_price=Decimal(20))),
+    ("get_menu_for_restaurant", "get_menu_for_restaurant", dict(restaurant_id=1)),
+    ("get_restaurant_with_menu", "get_restaurant_with_menu", dict(restaurant_id=1)),
+    ("search_restaurants", "search_restaurants", dict(q="restaurant")),
+    ("search_menu_items_text", "search_menu_items_text", dict(q="pasta")),
+    ("get_menu_item_facets", "get_menu_item_facets", {}),
+    ("get_menu_item_facets-filtered", "get_menu_item_facets",
+     dict(vegetarian=True, min_price=Decimal(5))),
+    ("get_restaurant_version", "get_restaurant_version", dict(restaurant_id=1)),
+    ("get_restaurants_version", "get_restaurants_version", {}),
+    ("get_menu_item_version", "get_menu_item_version", dict(item_id=1)),
+    ("get_menu_items_version", "get_menu_items_version", {}),
+    ("get_menu_items_version-restaurant", "get_menu_items_version", dict(restaurant_id=1)),
+    ("get_restaurant_with_menu_version", "get_restaurant_with_menu_version", dict(restaurant_id=1)),
+    ("create_restaurant", "create_restaurant", dict(restaurant=restaurant(100))),
+    ("update_restaurant", "update_restaurant",
+     dict(restaurant_id=2, restaurant_update=RestaurantUpdate(rating=3.0))),
+    ("create_menu_item", "create_menu_item", dict(restaurant_id=1, item=menu_item(100))),
+    ("update_menu_item", "update_menu_item",
+     dict(item_id=2, item_update=MenuItemUpdate(price=Decimal(3)))),
+    ("delete_menu_item", "delete_menu_item", dict(item_id=3)),
+    ("delete_restaurant", "delete_restaurant", dict(restaurant_id=3)),
+    ("bulk_upsert_restaurants", "bulk_upsert_restaurants",
+     dict(restaurants=[restaurant(1), restaurant(200)])),
+    ("bulk_create_menu_items", "bulk_create_menu_items",
+     dict(restaurant_id=1, items=[menu_item(300), menu_item(301)])),
+]
+
+# case id -> {plan line prefix: why that scan or sort is fine}
+EXPECTED_SCANS = {
+    "get_restaurants-first-page": {
+        "SCAN restaurants": "OFFSET page: walks rowid order and stops after skip + limit rows",
+    },
+    "get_restaurants-rating-first-page": {
+        "SCAN restaurants USING INDEX ix_restaurants_rating":
+            "OFFSET page: walks the rating index and stops after skip + limit rows",
+    },
+    "search_restaurants_by_cuisine-first-page": {
+        "SCAN restaurants": "ILIKE '%x%' cannot seek; /search (FTS5) is the indexed path",
+    },
+    "get_active_restaurants-first-page": {
+        "SCAN restaurants USING INDEX ix_restaurants_active_id":
+            "OFFSET page over the partial index of active rows only",
+    },
+    "get_all_menu_items-first-page": {
+        "SCAN menu_items": "OFFSET page: walks rowid order and stops after skip + limit rows",
+    },
+    "search_menu_items-vegetarian-first-page": {
+        "SCAN menu_items USING INDEX ix_menu_items_vegetarian_id":
+            "OFFSET page over the partial index of vegetarian rows only",
+    },
+    "search_menu_items-category": {
+        "SCAN menu_items": "ILIKE '%x%' cannot seek; /search (FTS5) is the indexed path",
+    },
+    "search_menu_items-price-range": {
+        "SCAN menu_items": "ranges are checked in id order; a page stops after `limit` matches",
+    },
+    "search_restaurants": {
+        "USE TEMP B-TREE FOR ORDER BY": "BM25 ranking sorts the FTS hits, never the table",
+    },
+    "search_menu_items_text": {
+        "USE TEMP B-TREE FOR ORDER BY": "BM25 ranking sorts the FTS hits, never the table",
+    },
+    "get_menu_item_facets": {
+        "SCAN menu_items USING COVERING INDEX ix_menu_items_facets":
+            "facet counts cover every match; read from the covering index, not the rows",
+    },
+    "get_menu_item_facets-filtered": {
+        "SCAN menu_items USING COVERING INDEX ix_menu_items_facets":
+            "facet counts cover every match; read from the covering index, not the rows",
+    },
+    "get_restaurants_version": {
+        "SCAN restaurants USING COVERING INDEX":
+            "count(*) of the whole table is a b-tree count over its smallest index",
+    },
+    "get_menu_items_version": {
+        "SCAN menu_items USING COVERING INDEX":
+            "count(*) of the whole table is a b-tree count over its smallest index",
+    },
+}
+
+
+def _is_flagged(line: str) -> bool:
+    # a bare "SEARCH <table>" (max() with no index to seek) reads every row too
+    return "USE TEMP B-TREE" in line or any(
+        line in (f"SCAN {table}", f"SEARCH {table}") or line.startswith(f"SCAN {table} ")
+        for table in LARGE_TABLES
+    )
+
+
+async def _collect_plans():
+    await create_tables()
+    async with AsyncSessionLocal() as db:
+        await crud.bulk_upsert_restaurants(db, [restaurant(n) for n in range(1, 21)])
+        for restaurant_id in range(1, 6):
+            await crud.bulk_create_menu_items(db, restaurant_id, [menu_item(n) for n in range(5)])
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    plans = {}
+    try:
+        for case_id, name, kwargs in CASES:
+            statements.clear()
+            async with AsyncSessionLocal() as db:
+                await getattr(crud, name)(db, **kwargs)
+            issued = list(statements)
+            plans[case_id] = []
+            async with engine.connect() as conn:
+                for statement, parameters in issued:
+                    if statement.lstrip().upper().startswith("INSERT"):
+                        continue  # VALUES lists have no plan worth checking
+                    rows = await conn.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {statement}", parameters
+                    )
+                    plans[case_id].append((statement, [row[3] for row in rows]))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        await engine.dispose()
+    return plans
+
+
+@pytest.fixture(scope="module")
+def plans():
+    yield asyncio.run(_collect_plans())
+    for path in WORKDIR.glob("restaurants.db*"):
+        path.unlink()
+
+
+@pytest.mark.parametrize("case_id", [case_id for case_id, _, _ in CASES])
+def test_query_plan(plans, case_id):
+    expected = EXPECTED_SCANS.get(case_id, {})
+    unexpected = [
+        (" ".join(statement.split()), line)
+        for statement, lines in plans[case_id]
+        for line in lines
+        if _is_flagged(line) and not any(line.startswith(prefix) for prefix in expected)
+    ]
+    assert unexpected == []
+
+
+@pytest.mark.parametrize("case_id", sorted(EXPECTED_SCANS))
+def test_expected_scans_still_happen(plans, case_id):
+    # drop an entry once an index makes its scan go away
+    lines = [line for _, plan in plans[case_id] for line in plan]
+    for prefix in EXPECTED_SCANS[case_id]:
+        assert any(line.startswith(prefix) for line in lines), prefix
+
+
+def test_every_crud_function_is_covered():
+    functions = {
+        name for name, function in inspect.getmembers(crud, inspect.iscoroutinefunction)
+        if function.__module__ == crud.__name__ and not name.startswith("_")
+    }
+    assert functions - {name for _, name, _ in CASES} == set()
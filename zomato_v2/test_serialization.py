@@ -0,0 +1,54 @@
+# test_serialization.py
+#
+# FAST_RESPONSES=true must not change a single byte of any list response.
+
+import pytest
+
+import serialization
+from conftest import menu_item_payload, restaurant_payload
+from routes import menu_items
+
+URLS = [
+    "/restaurants/",
+    "/restaurants/?limit=2",
+    "/restaurants/?sort=rating",
+    "/restaurants/open?at=12:00",
+    "/restaurants/1/menu",
+    "/menu-items/",
+    "/menu-items/?limit=2",
+    "/menu-items/search?vegetarian=true",
+    "/menu-items/search/faceted?category=main",
+]
+HEADERS = ("content-type", "etag", "x-next-cursor")
+
+
+@pytest.fixture
+def catalog(client):
+    for n in range(3):
+        client.post("/restaurants/", json=restaurant_payload(
+            n, rating=n + 0.5, description=None if n else "Family run"
+        ))
+    client.post("/restaurants/1/menu-items/bulk", json=[
+        menu_item_payload(0, price="12.50", is_vegetarian=True),
+        menu_item_payload(1, price="7", description="Spicy"),
+        menu_item_payload(2, price="0.99", is_vegetarian=True, is_vegan=True),
+    ])
+    client.put("/menu-items/2", json={"price": "8.25"})
+
+
+def _fast_responses(monkeypatch, on: bool) -> None:
+    monkeypatch.setattr(serialization, "FAST_RESPONSES", on)
+    monkeypatch.setattr(menu_items, "FAST_RESPONSES", on)
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_fast_path_matches_the_response_model(client, catalog, monkeypatch, url):
+    _fast_responses(monkeypatch, False)
+    expected = client.get(url)
+    _fast_responses(monkeypatch, True)
+    fast = client.get(url)
+
+    assert fast.status_code == expected.status_code == 200
+    assert expected.json()  # the comparison below is not between empty lists
+    assert fast.content == expected.content
+    assert [fast.headers.get(h) for h in HEADERS] == [expected.headers.get(h) for h in HEADERS]
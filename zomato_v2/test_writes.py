@@ -0,0 +1,66 @@
+# test_writes.py
+#
+# PUT and DELETE run one UPDATE/DELETE ... RETURNING (statement counts are
+# in test_query_counts.py); these check what that single statement returns.
+
+import pytest
+
+
+def test_update_restaurant_returns_the_new_row(client, restaurant):
+    response = client.put("/restaurants/1", json={"rating": 4.5, "name": "Renamed"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["rating"], body["name"], body["address"]) == (4.5, "Renamed", restaurant["address"])
+    assert client.get("/restaurants/1").json() == body
+
+
+def test_update_menu_item_returns_the_new_row(client, restaurant):
+    response = client.put("/menu-items/1", json={"price": "12.00"})
+
+    assert response.status_code == 200
+    assert response.json()["price"] == "12.00"
+    assert client.get("/menu-items/1").json() == response.json()
+
+
+@pytest.mark.parametrize("url", ["/restaurants/1", "/menu-items/1"])
+def test_empty_update_returns_the_row_unchanged(client, restaurant, url):
+    before = client.get(url).json()
+
+    response = client.put(url, json={})
+
+    assert response.status_code == 200
+    assert response.json() == before
+
+
+@pytest.mark.parametrize("method,url,body", [
+    ("PUT", "/restaurants/999", {"rating": 4.5}),
+    ("DELETE", "/restaurants/999", None),
+    ("PUT", "/menu-items/999", {"price": "12.00"}),
+    ("DELETE", "/menu-items/999", None),
+])
+def test_missing_row_is_404(client, restaurant, method, url, body):
+    assert client.request(method, url, json=body).status_code == 404
+
+
+def test_delete_menu_item_returns_the_deleted_row(client, restaurant):
+    item = client.get("/menu-items/1").json()
+
+    response = client.delete("/menu-items/1")
+
+    assert response.status_code == 200
+    assert response.json() == item
+    assert client.get("/menu-items/1").status_code == 404
+
+
+def test_delete_restaurant_cascades_to_its_menu(client, restaurant):
+    assert len(client.get("/search?q=dish").json()["menu_items"]) == 2
+
+    response = client.delete("/restaurants/1")
+
+    assert response.status_code == 200
+    assert response.json()["id"] == 1
+    # a bulk DELETE skips the ORM cascade; the foreign key's ON DELETE CASCADE runs
+    assert [client.get(f"/menu-items/{n}").status_code for n in (1, 2)] == [404, 404]
+    # and the FTS triggers drop the menu items from search
+    assert client.get("/search?q=dish").json()["menu_items"] == []